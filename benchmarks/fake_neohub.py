@@ -0,0 +1,285 @@
+"""Local stand-in for a Heatmiser Neo hub.
+
+Speaks the hub's JSON protocol on a TCP port: requests are JSON objects
+terminated by NUL and CR, replies are JSON terminated by NUL. It answers
+FIRMWARE, INFO, ENGINEERS_DATA, GET_LIVE_DATA, READ_COMFORT_LEVELS,
+SET_TEMP, HOLD, FROST_ON, FROST_OFF, SET_FROST, TIMER_ON and TIMER_OFF for
+a configurable number of thermostats and NeoPlugs, and can add latency, drop
+connections and pad replies to mimic large or flaky hubs.
+
+Run it on its own to point a development Home Assistant at it:
+
+    python benchmarks/fake_neohub.py --devices 30 --port 4242
+"""
+import argparse
+import asyncio
+import collections
+import json
+import random
+import time
+
+
+class FakeNeoHub:
+    """Asyncio TCP server imitating a Neo hub."""
+
+    def __init__(
+        self,
+        devices=10,
+        latency=0.0,
+        drop_rate=0.0,
+        padding=0,
+        churn=0.2,
+        close_after_reply=False,
+        live=True,
+        plugs=0,
+        seed=None,
+    ):
+        """Initialize.
+
+        latency is the delay in seconds before each reply, drop_rate the
+        chance a connection is closed instead of answered, padding the number
+        of extra bytes per device in INFO, churn the share of devices whose
+        temperature moves between INFO or GET_LIVE_DATA requests. live=False
+        answers GET_LIVE_DATA with an error like older firmware. plugs is
+        the number of NeoPlugs added after the thermostats.
+        """
+        self.latency = latency
+        self.drop_rate = drop_rate
+        self.padding = padding
+        self.churn = churn
+        self.close_after_reply = close_after_reply
+        self.live = live
+        self.random = random.Random(seed)
+        self.devices = {f"Zone {index + 1}": self._device(index) for index in range(devices)}
+        self.engineers = {
+            name: {"FROST TEMPERATURE": 12, "SWITCHING DIFFERENTIAL": 1, "OUTPUT DELAY": 0}
+            for name in self.devices
+        }
+        self.devices.update((f"Plug {index + 1}", self._plug(index)) for index in range(plugs))
+        self.engineers_timestamp = int(time.time())
+        self.connections = 0
+        self.dropped = 0
+        self.requests = collections.Counter()
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._server = None
+        self._clients = {}
+
+    @staticmethod
+    def _device(index):
+        """Return the INFO entry of a thermostat."""
+        return {
+            "DEVICE_TYPE": 1,
+            "STAT_MODE": {"THERMOSTAT": True},
+            "TEMPERATURE_FORMAT": "C",
+            "CURRENT_TEMPERATURE": f"{19 + index % 4}.5",
+            "CURRENT_SET_TEMPERATURE": "21.0",
+            "HUMIDITY": 0,
+            "CURRENT_FLOOR_TEMPERATURE": 127,
+            "HEATING": index % 3 == 0,
+            "COOLING": False,
+            "COOLING_ENABLED": False,
+            "STANDBY": False,
+            "TEMP_HOLD": False,
+            "HOLD_TEMPERATURE": 20,
+            "HOLD_TIME": "0:00",
+        }
+
+    @staticmethod
+    def _plug(index):
+        """Return the INFO entry of a NeoPlug."""
+        return {
+            "DEVICE_TYPE": 6,
+            "STAT_MODE": {"TIMECLOCK": True},
+            "TIMER": index % 2 == 0,
+            "TIME_CLOCK_OVERIDE_BIT": False,
+            "STANDBY": False,
+            "HOLD_TIME": "0:00",
+        }
+
+    @property
+    def port(self):
+        """Return the port the server listens on."""
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self, host="127.0.0.1", port=0):
+        """Start listening."""
+        self._server = await asyncio.start_server(self._handle, host, port)
+
+    async def stop(self):
+        """Stop listening and disconnect clients."""
+        self._server.close()
+        for writer in self._clients:
+            writer.close()
+        await asyncio.gather(*self._clients.values(), return_exceptions=True)
+        await self._server.wait_closed()
+
+    def move_temperatures(self):
+        """Move the temperature of some devices."""
+        for device in self.devices.values():
+            if "CURRENT_TEMPERATURE" in device and self.random.random() < self.churn:
+                current = float(device["CURRENT_TEMPERATURE"])
+                device["CURRENT_TEMPERATURE"] = f"{current + self.random.choice((-0.5, 0.5)):.1f}"
+
+    def info(self):
+        """Return the INFO reply, moving some temperatures first."""
+        self.move_temperatures()
+        padding = "x" * self.padding
+        devices = []
+        for name, device in self.devices.items():
+            entry = {"device": name, **device}
+            if padding:
+                entry["PADDING"] = padding
+            devices.append(entry)
+        return {"devices": devices}
+
+    @staticmethod
+    def comfort_levels():
+        """Return the comfort levels of a zone in 5/2 day mode."""
+        return {
+            "weekday": {
+                "wake": ["06:30", 21],
+                "leave": ["08:30", 16],
+                "return": ["17:00", 21],
+                "sleep": ["22:30", 16],
+            },
+            "weekend": {
+                "wake": ["08:00", 21],
+                "leave": ["24:00", 21],
+                "return": ["24:00", 21],
+                "sleep": ["23:00", 16],
+            },
+        }
+
+    def live_data(self):
+        """Return the GET_LIVE_DATA reply, moving some temperatures first."""
+        self.move_temperatures()
+        return {
+            "HUB_TIME": int(time.time()),
+            "TIMESTAMP_DEVICE_LISTS": 1,
+            "TIMESTAMP_ENGINEERS": self.engineers_timestamp,
+            "TIMESTAMP_PROFILE_COMFORT_LEVELS": 1,
+            "devices": [
+                {
+                    "ZONE_NAME": name,
+                    "ACTUAL_TEMP": device.get("CURRENT_TEMPERATURE"),
+                    "SET_TEMP": device.get("CURRENT_SET_TEMPERATURE"),
+                    "HEAT_ON": device.get("HEATING", False),
+                    "HOLD_ON": device.get("TEMP_HOLD", False),
+                    "STANDBY": device["STANDBY"],
+                    "TIMER_ON": device.get("TIMER", False),
+                }
+                for name, device in self.devices.items()
+            ],
+        }
+
+    def answer(self, request):
+        """Return the reply to one request."""
+        command, args = next(iter(request.items()))
+        self.requests[command] += 1
+
+        if command == "FIRMWARE":
+            return {"firmware version": "2134"}
+        if command == "INFO":
+            return self.info()
+        if command == "ENGINEERS_DATA":
+            return self.engineers
+        if command == "READ_COMFORT_LEVELS":
+            return {name: self.comfort_levels() for name in args if name in self.devices}
+        if command == "GET_LIVE_DATA":
+            return self.live_data() if self.live else {"error": "Invalid argument to GET_LIVE_DATA"}
+
+        if command in ("FROST_ON", "FROST_OFF", "TIMER_ON", "TIMER_OFF"):
+            value, targets = None, args
+        else:
+            value, targets = args
+        if isinstance(targets, str):
+            targets = [targets]
+        for name in targets:
+            if name not in self.devices:
+                return {"error": f"Unknown device {name}"}
+
+        for name in targets:
+            device = self.devices[name]
+            if command == "SET_TEMP":
+                device["CURRENT_SET_TEMPERATURE"] = f"{float(value):.1f}"
+            elif command == "HOLD":
+                held = bool(value["hours"] or value["minutes"])
+                device["TEMP_HOLD"] = held
+                device["HOLD_TEMPERATURE"] = value["temp"]
+                device["HOLD_TIME"] = f"{value['hours']}:{value['minutes']:02d}"
+            elif command in ("FROST_ON", "FROST_OFF"):
+                device["STANDBY"] = command == "FROST_ON"
+            elif command in ("TIMER_ON", "TIMER_OFF"):
+                device["TIMER"] = command == "TIMER_ON"
+                device["TIME_CLOCK_OVERIDE_BIT"] = True
+            elif command == "SET_FROST":
+                self.engineers[name]["FROST TEMPERATURE"] = value
+                self.engineers_timestamp += 1
+            else:
+                return {"error": f"Unsupported command {command}"}
+        return {"result": f"{command} ok"}
+
+    async def _handle(self, reader, writer):
+        """Serve one client connection."""
+        self.connections += 1
+        self._clients[writer] = asyncio.current_task()
+        buf = b""
+        try:
+            while data := await reader.read(65536):
+                self.bytes_in += len(data)
+                buf += data
+                while b"\0\r" in buf:
+                    raw, buf = buf.split(b"\0\r", 1)
+                    if self.random.random() < self.drop_rate:
+                        self.dropped += 1
+                        return
+                    if self.latency:
+                        await asyncio.sleep(self.latency)
+                    reply = json.dumps(self.answer(json.loads(raw))).encode() + b"\0"
+                    self.bytes_out += len(reply)
+                    writer.write(reply)
+                    await writer.drain()
+                    if self.close_after_reply:
+                        return
+        except ConnectionError:
+            pass
+        finally:
+            self._clients.pop(writer, None)
+            writer.close()
+
+
+async def _serve(args):
+    """Run the fake hub until interrupted."""
+    hub = FakeNeoHub(
+        devices=args.devices,
+        plugs=args.plugs,
+        latency=args.latency_ms / 1000,
+        drop_rate=args.drop_rate,
+        padding=args.padding,
+        close_after_reply=args.close_after_reply,
+    )
+    await hub.start(args.host, args.port)
+    print(f"Fake Neo hub with {args.devices} devices and {args.plugs} plugs on {args.host}:{hub.port}")
+    await asyncio.Event().wait()
+
+
+def main():
+    """Parse arguments and serve."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4242)
+    parser.add_argument("--devices", type=int, default=10)
+    parser.add_argument("--plugs", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--padding", type=int, default=0)
+    parser.add_argument("--close-after-reply", action="store_true")
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Micro-benchmark for framing Heatmiser Neo hub replies.
+
+Compares the receive loop json_request used to have, which decoded the whole
+growing buffer on every 4 KiB chunk, with NeoFrameBuffer on a synthetic INFO
+reply from a hub with 100 devices.
+
+Run from the repository root:
+
+    python benchmarks/heatmiserneo_framing.py
+"""
+import importlib.util
+import json
+import pathlib
+import timeit
+
+HUB_PATH = pathlib.Path(__file__).resolve().parents[1] / "heatmiserneo" / "hub.py"
+
+# hub.py only needs the standard library, so load it without Home Assistant.
+_spec = importlib.util.spec_from_file_location("heatmiserneo_hub", HUB_PATH)
+hub = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(hub)
+
+CHUNK = 4096
+DEVICES = 100
+ROUNDS = 200
+
+
+def synthetic_info(devices=DEVICES):
+    """Return an INFO reply as sent by a hub with the given number of devices."""
+    return {
+        "devices": [
+            {
+                "device": f"Zone {index}",
+                "DEVICE_TYPE": 1,
+                "STAT_MODE": {"THERMOSTAT": True},
+                "TEMPERATURE_FORMAT": "C",
+                "CURRENT_TEMPERATURE": "20.5",
+                "CURRENT_SET_TEMPERATURE": "21.0",
+                "CURRENT_FLOOR_TEMPERATURE": 127,
+                "HUMIDITY": 0,
+                "HEATING": index % 3 == 0,
+                "COOLING": False,
+                "COOLING_ENABLED": False,
+                "STANDBY": False,
+                "TEMP_HOLD": False,
+                "HOLD_TEMPERATURE": 20,
+                "HOLD_TIME": "0:00",
+                "HOLIDAY": False,
+                "HOLIDAY_DAYS": 0,
+                "LOW_BATTERY": False,
+                "LOCK": False,
+                "OFFLINE": False,
+                "PROGRAM_MODE": "7day",
+                "NEXT_ON_TIME": "255:255",
+                "WRITE_COUNT": 12,
+                "SWITCH_DELAY_LEFT": "0:00",
+            }
+            for index in range(devices)
+        ]
+    }
+
+
+def legacy_frame(chunks):
+    """Frame a reply the way json_request used to."""
+    buf = chunks[0]
+    rest = iter(chunks[1:])
+    while True:
+        if "\n" in str(buf, "utf-8"):
+            response = str(buf, "utf-8").split("\n")[0]
+            break
+        more = next(rest, None)
+        if not more:
+            response = str(buf, "utf-8")
+            break
+        buf += more
+    return response.rstrip("\0")
+
+
+def buffered_frame(chunks):
+    """Frame a reply with NeoFrameBuffer."""
+    frames = hub.NeoFrameBuffer()
+    for chunk in chunks:
+        for frame in frames.feed(chunk):
+            return frame
+    return None
+
+
+def timed(func, chunks):
+    """Return the best mean time in seconds of func over the chunks."""
+    return min(timeit.repeat(lambda: func(chunks), number=ROUNDS, repeat=5)) / ROUNDS
+
+
+def main():
+    """Run the benchmark and print the mean time per reply."""
+    payload = json.dumps(synthetic_info()).encode() + b"\0\n"
+    assert json.loads(legacy_frame([payload])) == json.loads(buffered_frame([payload]))
+
+    for chunk in (CHUNK, 1460):
+        chunks = [payload[i:i + chunk] for i in range(0, len(payload), chunk)]
+        print(f"{DEVICES} devices, {len(payload)} bytes in {len(chunks)} chunks of {chunk}")
+        cases = (
+            ("legacy framing", legacy_frame),
+            ("NeoFrameBuffer framing", buffered_frame),
+            ("legacy + json", lambda c: json.loads(legacy_frame(c), strict=False)),
+            ("NeoFrameBuffer + json", lambda c: json.loads(buffered_frame(c), strict=False)),
+        )
+        results = {name: timed(func, chunks) for name, func in cases}
+        for name, seconds in results.items():
+            print(f"{name:>24}: {seconds * 1000:.3f} ms per reply")
+        print(
+            f"{'framing speed-up':>24}: "
+            f"{results['legacy framing'] / results['NeoFrameBuffer framing']:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
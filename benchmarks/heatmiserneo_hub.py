@@ -0,0 +1,335 @@
+"""Benchmark the Heatmiser Neo hub stack against a fake hub.
+
+Starts FakeNeoHub locally and drives HeatmiserNeoHub and the command queue
+against it, reporting:
+
+- poll latency percentiles for HeatmiserNeoHub.update,
+- write throughput, batched through HeatmiserNeoCommandQueue and one by one,
+- bytes and time of live mode (GET_LIVE_DATA probes, INFO on change) against
+  full INFO polls at the same rate,
+- how many of several hubs poll at once with the shared scheduler against
+  jittered intervals, and the peak of requests in flight under its limit,
+- connections opened on the hub and executor jobs submitted,
+- when Home Assistant is installed, how many entity state writes the
+  coordinator triggers per poll compared to writing every entity.
+
+Run from the repository root, for example:
+
+    python benchmarks/heatmiserneo_hub.py --devices 30 --latency-ms 20 --drop-rate 0.01
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import importlib.util
+import pathlib
+import random
+import statistics
+import sys
+import time
+
+from fake_neohub import FakeNeoHub
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+
+# hub.py only needs the standard library, so load it without Home Assistant.
+_spec = importlib.util.spec_from_file_location(
+    "heatmiserneo_hub", ROOT / "heatmiserneo" / "hub.py"
+)
+hub_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(hub_module)
+
+_spec = importlib.util.spec_from_file_location(
+    "heatmiserneo_scheduler", ROOT / "heatmiserneo" / "scheduler.py"
+)
+scheduler_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(scheduler_module)
+
+
+class CountingExecutor(concurrent.futures.ThreadPoolExecutor):
+    """Default executor that counts the jobs handed to it."""
+
+    def __init__(self):
+        """Initialize."""
+        super().__init__()
+        self.jobs = 0
+
+    def submit(self, *args, **kwargs):
+        """Count and submit a job."""
+        self.jobs += 1
+        return super().submit(*args, **kwargs)
+
+
+def percentiles(samples):
+    """Return p50, p90, p99 and max of samples in milliseconds."""
+    if len(samples) < 2:
+        value = samples[0] * 1000 if samples else float("nan")
+        return value, value, value, value
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return cuts[49] * 1000, cuts[89] * 1000, cuts[98] * 1000, max(samples) * 1000
+
+
+async def bench_polls(fake, polls):
+    """Time sequential hub polls."""
+    hub = fake_client(fake)
+    latencies = []
+    failures = 0
+    for _ in range(polls):
+        start = time.perf_counter()
+        data = await hub.update()
+        latencies.append(time.perf_counter() - start)
+        if data is None:
+            failures += 1
+    await hub.close()
+
+    p50, p90, p99, worst = percentiles(latencies)
+    print(f"polls: {polls}, failed: {failures}")
+    print(f"  latency p50 {p50:.2f} ms, p90 {p90:.2f} ms, p99 {p99:.2f} ms, max {worst:.2f} ms")
+
+
+async def bench_live(fake, cycles, churn):
+    """Compare live probing with full polls while few values change."""
+    saved_churn, fake.churn = fake.churn, churn
+
+    hub = fake_client(fake)
+    before = fake.bytes_out
+    start = time.perf_counter()
+    for _ in range(cycles):
+        await hub.update()
+    polled = time.perf_counter() - start, fake.bytes_out - before
+    await hub.close()
+
+    hub = fake_client(fake)
+    before = fake.bytes_out
+    token = None
+    full_reads = 0
+    start = time.perf_counter()
+    for _ in range(cycles):
+        if (new_token := await hub.probe()) is None or new_token != token:
+            token = new_token
+            full_reads += 1
+            await hub.update()
+    live = time.perf_counter() - start, fake.bytes_out - before
+    await hub.close()
+    fake.churn = saved_churn
+
+    print(f"live mode over {cycles} cycles, churn {churn}: {full_reads} full reads")
+    for label, (elapsed, sent) in (("full polls", polled), ("live", live)):
+        print(f"  {label}: {elapsed * 1000:.1f} ms, {sent / 1024:.1f} KiB from the hub")
+
+
+def write_plan(fake, writes):
+    """Return a mix of writes as an automation touching every zone would make."""
+    names = list(fake.devices)
+    plan = []
+    for index in range(writes):
+        name = names[index % len(names)]
+        if index % 3 == 0:
+            plan.append(("SET_TEMP", 19.0 + index % 2, name))
+        elif index % 3 == 1:
+            plan.append(("FROST_ON", None, name))
+        else:
+            plan.append(("SET_FROST", 10, name))
+    return plan
+
+
+async def bench_writes(fake, writes):
+    """Compare batched and one-by-one writes."""
+    plan = write_plan(fake, writes)
+
+    hub = fake_client(fake)
+    before = sum(fake.requests.values())
+    start = time.perf_counter()
+    for command, args, name in plan:
+        request = {command: name} if args is None else {command: [args, name]}
+        await hub.json_request(request)
+    elapsed = time.perf_counter() - start
+    await hub.close()
+    print(
+        f"one by one: {writes} writes in {elapsed * 1000:.1f} ms "
+        f"({writes / elapsed:.0f} writes/s, {sum(fake.requests.values()) - before} hub requests)"
+    )
+
+    hub = fake_client(fake)
+    flushes = 0
+
+    async def on_flush():
+        nonlocal flushes
+        flushes += 1
+
+    queue = hub_module.HeatmiserNeoCommandQueue(hub, on_flush=on_flush)
+    before = sum(fake.requests.values())
+    start = time.perf_counter()
+    await asyncio.gather(*(queue.send(command, args, name) for command, args, name in plan))
+    elapsed = time.perf_counter() - start
+    await hub.close()
+    print(
+        f"batched:    {writes} writes in {elapsed * 1000:.1f} ms "
+        f"({writes / elapsed:.0f} writes/s, {sum(fake.requests.values()) - before} hub requests, "
+        f"{flushes} refreshes; includes the {hub_module.COMMAND_DEBOUNCE * 1000:.0f} ms window)"
+    )
+
+
+async def bench_entities(fake, polls):
+    """Count entity state writes the coordinator triggers per poll."""
+    try:
+        from homeassistant.core import HomeAssistant
+    except ImportError:
+        print("entity updates: skipped, Home Assistant is not installed")
+        return
+
+    sys.path.insert(0, str(ROOT))
+    from heatmiserneo import climate, number, sensor, switch
+    from heatmiserneo.coordinator import HeatmiserNeoCoordinator
+    from heatmiserneo.entity import HeatmiserNeoEntity
+
+    entity_classes = {
+        cls
+        for module in (climate, number, sensor, switch)
+        for cls in vars(module).values()
+        if isinstance(cls, type) and issubclass(cls, HeatmiserNeoEntity)
+    }
+    entity_classes.discard(HeatmiserNeoEntity)
+
+    hass = HomeAssistant(str(ROOT))
+    coordinator = HeatmiserNeoCoordinator(hass, "127.0.0.1", fake.port)
+    notified = 0
+    writes = 0
+
+    def on_update():
+        nonlocal notified, writes
+        notified += 1
+        writes += sum(
+            coordinator.device_changed(name, cls._neo_fields)
+            for name in coordinator.data
+            for cls in entity_classes
+        )
+
+    unsub = coordinator.async_add_listener(on_update)
+    await coordinator.async_refresh()
+    notified = writes = 0
+    for _ in range(polls):
+        await coordinator.async_refresh()
+    unsub()
+    await coordinator.async_shutdown()
+    await hass.async_stop(force=True)
+
+    every = polls * len(fake.devices) * len(entity_classes)
+    print(
+        f"entity updates over {polls} polls: {writes} state writes "
+        f"({notified} notifications) vs {every} writing every entity"
+    )
+
+
+def busiest_second(times):
+    """Return the most polls falling within one second of each other."""
+    times = sorted(times)
+    busiest = start = 0
+    for end, time_ in enumerate(times):
+        while time_ - times[start] > 1:
+            start += 1
+        busiest = max(busiest, end - start + 1)
+    return busiest
+
+
+async def bench_hubs(hubs, devices, latency, polls):
+    """Compare polls of several hubs spread by the scheduler with jittered ones."""
+    interval = 30
+    rng = random.Random(1)
+    scheduler = scheduler_module.HeatmiserNeoPollScheduler()
+    for hub in range(hubs):
+        scheduler.register(hub, hub_module.HeatmiserNeoStats())
+    # Every hub starts together, as after a restart, and is then rescheduled
+    # after each poll, which takes a random 0-2 s.
+    jittered = [0.0] * hubs
+    scheduled = [0.0] * hubs
+    jittered_peak = scheduled_peak = 0
+    for _ in range(polls):
+        jittered = [
+            time_ + rng.uniform(0, 2) + interval * rng.uniform(0.9, 1.1) for time_ in jittered
+        ]
+        scheduled = [
+            (end := time_ + rng.uniform(0, 2)) + scheduler.next_interval(hub, interval, end)
+            for hub, time_ in enumerate(scheduled)
+        ]
+        jittered_peak = max(jittered_peak, busiest_second(jittered))
+        scheduled_peak = max(scheduled_peak, busiest_second(scheduled))
+    print(f"{hubs} hubs polled every {interval} s, {polls} rounds: most polls within 1 s")
+    print(f"  jittered: {jittered_peak}, scheduled: {scheduled_peak}")
+
+    fakes = [FakeNeoHub(devices=devices, latency=latency, seed=hub) for hub in range(hubs)]
+    for fake in fakes:
+        await fake.start()
+    for label, limit in (("unlimited", hubs * hub_module.MAX_IN_FLIGHT), ("limited", None)):
+        limiter = scheduler_module.RequestLimiter(limit or scheduler_module.GLOBAL_MAX_IN_FLIGHT)
+        clients = [
+            hub_module.HeatmiserNeoHub("127.0.0.1", fake.port, limiter=limiter) for fake in fakes
+        ]
+        start = time.perf_counter()
+        await asyncio.gather(*(client.update() for client in clients))
+        elapsed = time.perf_counter() - start
+        print(
+            f"  burst of {hubs} polls {label}: peak {limiter.peak_in_flight} requests "
+            f"in flight, {elapsed * 1000:.1f} ms"
+        )
+        for client in clients:
+            await client.close()
+    for fake in fakes:
+        await fake.stop()
+
+
+def fake_client(fake):
+    """Return a HeatmiserNeoHub connected to the fake hub."""
+    return hub_module.HeatmiserNeoHub("127.0.0.1", fake.port)
+
+
+async def run(args):
+    """Run every benchmark."""
+    executor = CountingExecutor()
+    asyncio.get_running_loop().set_default_executor(executor)
+
+    fake = FakeNeoHub(
+        devices=args.devices,
+        latency=args.latency_ms / 1000,
+        drop_rate=args.drop_rate,
+        padding=args.padding,
+        close_after_reply=args.close_after_reply,
+        seed=1,
+    )
+    await fake.start()
+    print(
+        f"fake hub: {args.devices} devices, {args.latency_ms} ms latency, "
+        f"drop rate {args.drop_rate}, {args.padding} bytes padding per device"
+    )
+
+    await bench_polls(fake, args.polls)
+    await bench_writes(fake, args.writes)
+    await bench_live(fake, args.polls, args.live_churn)
+    await bench_entities(fake, args.polls)
+    await bench_hubs(args.hubs, args.devices, args.latency_ms / 1000, args.polls)
+
+    print(
+        f"hub connections: {fake.connections}, dropped: {fake.dropped}, "
+        f"bytes in/out: {fake.bytes_in}/{fake.bytes_out}"
+    )
+    print(f"executor jobs: {executor.jobs}")
+    await fake.stop()
+    executor.shutdown()
+
+
+def main():
+    """Parse arguments and run."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=30)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--padding", type=int, default=0)
+    parser.add_argument("--close-after-reply", action="store_true")
+    parser.add_argument("--polls", type=int, default=200)
+    parser.add_argument("--writes", type=int, default=60)
+    parser.add_argument("--live-churn", type=float, default=0.002)
+    parser.add_argument("--hubs", type=int, default=12)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,8 +5,15 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform, CONF_HOST, CONF_PORT
 from homeassistant.core import HomeAssistant
 
-from .const import DOMAIN
-from .coordinator import HeatmiserNeoCoordinator
+from .const import (
+    CONF_ENGINEERS_INTERVAL,
+    CONF_LIVE_MODE,
+    DEFAULT_ENGINEERS_INTERVAL,
+    DEFAULT_LIVE_MODE,
+    DOMAIN,
+)
+from .coordinator import snapshot_store
+from .manager import get_manager
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -19,10 +26,17 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     host = entry.data[CONF_HOST]
     port = entry.data[CONF_PORT]
 
-    coordinator = HeatmiserNeoCoordinator(hass, host, port)
-    await coordinator.async_config_entry_first_refresh()
+    engineers_interval = entry.options.get(CONF_ENGINEERS_INTERVAL, DEFAULT_ENGINEERS_INTERVAL)
+    live_mode = entry.options.get(CONF_LIVE_MODE, DEFAULT_LIVE_MODE)
+
+    # Entries for the same hub share its connection, polling and write queue.
+    coordinator = await get_manager(hass).async_acquire(
+        entry.entry_id, host, port, engineers_interval, live_mode
+    )
 
     hass.data[DOMAIN][entry.entry_id] = coordinator
+
+    entry.async_on_unload(entry.add_update_listener(async_options_updated))
     
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
@@ -31,6 +45,15 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await get_manager(hass).async_release(entry.entry_id, coordinator.host, coordinator.port)
 
     return unload_ok
+
+async def async_options_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget the stored snapshot of a removed hub."""
+    await snapshot_store(hass, entry.data[CONF_HOST], entry.data[CONF_PORT]).async_remove()
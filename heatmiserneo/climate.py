@@ -8,7 +8,7 @@ and added custom services to support Heatmiser Neostat hold/standby features
 """
 
 from homeassistant.components.climate import ClimateEntity, PLATFORM_SCHEMA
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+import asyncio
 import logging
 import voluptuous as vol
 from homeassistant.components.climate.const import (
@@ -29,12 +29,17 @@ from homeassistant.const import (ATTR_ATTRIBUTION,
                                  STATE_ON,
                                  UnitOfTemperature,
 )
+from homeassistant.core import SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
 import homeassistant.helpers.config_validation as cv
-from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.service import async_extract_entity_ids
 
 import socket
 import json
 from .const import DOMAIN
+from .entity import HeatmiserNeoEntity
+from .manager import get_manager
+from .registry import get_registry
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -49,8 +54,7 @@ SERVICE_NEO_UPDATE = "neo_update"
 
 # New
 SERVICE_HOLD_TEMPERATURE = "hold_temperature"
-SERVICE_HOLD_TEMPERATURE_SCHEMA = vol.Schema({
-    vol.Required(ATTR_ENTITY_ID): cv.entity_id,
+SERVICE_HOLD_TEMPERATURE_SCHEMA = cv.make_entity_service_schema({
     vol.Required("hold_temperature"): cv.string,
     vol.Required("hold_hours"): cv.string,
     vol.Required("hold_minutes"): cv.string,
@@ -58,26 +62,16 @@ SERVICE_HOLD_TEMPERATURE_SCHEMA = vol.Schema({
 )
 
 SERVICE_CANCEL_HOLD = "cancel_hold"
-SERVICE_CANCEL_HOLD_SCHEMA = vol.Schema({
-    vol.Required(ATTR_ENTITY_ID): cv.entity_id,
-    }
-)
+SERVICE_CANCEL_HOLD_SCHEMA = cv.make_entity_service_schema({})
 
 SERVICE_ACTIVATE_FROST = "activate_frost"
-SERVICE_ACTIVATE_FROST_SCHEMA = vol.Schema({
-    vol.Required(ATTR_ENTITY_ID): cv.entity_id,
-    }
-)
+SERVICE_ACTIVATE_FROST_SCHEMA = cv.make_entity_service_schema({})
 
 SERVICE_CANCEL_FROST = "cancel_frost"
-SERVICE_CANCEL_FROST_SCHEMA = vol.Schema({
-    vol.Required(ATTR_ENTITY_ID): cv.entity_id,
-    }
-)
+SERVICE_CANCEL_FROST_SCHEMA = cv.make_entity_service_schema({})
 
 SERVICE_SET_FROST_TEMP = "set_frost_temperature"
-SERVICE_SET_FROST_TEMP_SCHEMA = vol.Schema({
-    vol.Required(ATTR_ENTITY_ID): cv.entity_id,
+SERVICE_SET_FROST_TEMP_SCHEMA = cv.make_entity_service_schema({
     vol.Required("frost_temperature"): cv.string,
     }
 )
@@ -147,62 +141,87 @@ async def async_setup_entry(hass, entry, async_add_entities):
 
     if coordinator.data:
         for name, device in coordinator.data.items():
-            if device['DEVICE_TYPE'] != 6:
-                if (('TIMECLOCK' in device['STAT_MODE']) and (ExcludeTimeClock == True)):
+            if not device.is_plug:
+                if device.timeclock and (ExcludeTimeClock == True):
                     _LOGGER.debug("Found a Neostat configured in timer mode named: %s skipping" % name)
                 else:
                     thermostats.append(HeatmiserNeostat(coordinator, name))
 
-            elif device['DEVICE_TYPE'] == 6:
+            elif device.is_plug:
                 _LOGGER.debug("Found a Neoplug named: %s skipping" % name)
 
-    async_add_entities(thermostats, True)
+    async_add_entities(thermostats)
 
     # Service registration
     # We should register services only once, so we can check if they are already registered
     if not hass.services.has_service(COMPONENT_DOMAIN, SERVICE_HOLD_TEMPERATURE):
         async def async_hold_temperature(call):
             """Call hold temperature service handler."""
-            await async_handle_hold_temperature_service(hass, call)
+            response = await async_handle_hold_temperature_service(hass, call)
+            return response if call.return_response else None
 
         hass.services.async_register(
-            COMPONENT_DOMAIN, SERVICE_HOLD_TEMPERATURE, async_hold_temperature, schema=SERVICE_HOLD_TEMPERATURE_SCHEMA
+            COMPONENT_DOMAIN,
+            SERVICE_HOLD_TEMPERATURE,
+            async_hold_temperature,
+            schema=SERVICE_HOLD_TEMPERATURE_SCHEMA,
+            supports_response=SupportsResponse.OPTIONAL,
         )
 
     if not hass.services.has_service(COMPONENT_DOMAIN, SERVICE_CANCEL_HOLD):
         async def async_cancel_hold(call):
             """Call cancel hold service handler."""
-            await async_handle_cancel_hold_service(hass, call)
+            response = await async_handle_cancel_hold_service(hass, call)
+            return response if call.return_response else None
 
         hass.services.async_register(
-            COMPONENT_DOMAIN, SERVICE_CANCEL_HOLD, async_cancel_hold, schema=SERVICE_CANCEL_HOLD_SCHEMA
+            COMPONENT_DOMAIN,
+            SERVICE_CANCEL_HOLD,
+            async_cancel_hold,
+            schema=SERVICE_CANCEL_HOLD_SCHEMA,
+            supports_response=SupportsResponse.OPTIONAL,
         )
 
     if not hass.services.has_service(COMPONENT_DOMAIN, SERVICE_ACTIVATE_FROST):
         async def async_activate_frost(call):
             """Call activate frost service handler."""
-            await async_handle_activate_frost_service(hass, call)
+            response = await async_handle_activate_frost_service(hass, call)
+            return response if call.return_response else None
 
         hass.services.async_register(
-            COMPONENT_DOMAIN, SERVICE_ACTIVATE_FROST, async_activate_frost, schema=SERVICE_ACTIVATE_FROST_SCHEMA
+            COMPONENT_DOMAIN,
+            SERVICE_ACTIVATE_FROST,
+            async_activate_frost,
+            schema=SERVICE_ACTIVATE_FROST_SCHEMA,
+            supports_response=SupportsResponse.OPTIONAL,
         )
 
     if not hass.services.has_service(COMPONENT_DOMAIN, SERVICE_CANCEL_FROST):
         async def async_cancel_frost(call):
             """Call cancel frost service handler."""
-            await async_handle_cancel_frost_service(hass, call)
+            response = await async_handle_cancel_frost_service(hass, call)
+            return response if call.return_response else None
 
         hass.services.async_register(
-            COMPONENT_DOMAIN, SERVICE_CANCEL_FROST, async_cancel_frost, schema=SERVICE_CANCEL_FROST_SCHEMA
+            COMPONENT_DOMAIN,
+            SERVICE_CANCEL_FROST,
+            async_cancel_frost,
+            schema=SERVICE_CANCEL_FROST_SCHEMA,
+            supports_response=SupportsResponse.OPTIONAL,
         )
 
     if not hass.services.has_service(COMPONENT_DOMAIN, SERVICE_SET_FROST_TEMP):
         async def async_set_frost_temp(call):
             """Call set frost temp service handler."""
-            await async_handle_set_frost_temp_service(hass, call)
+            response = await async_handle_set_frost_temp_service(hass, call)
+            return response if call.return_response else None
 
         hass.services.async_register(
-            COMPONENT_DOMAIN, SERVICE_SET_FROST_TEMP, async_set_frost_temp, schema=SERVICE_SET_FROST_TEMP_SCHEMA
+            COMPONENT_DOMAIN,
+            SERVICE_SET_FROST_TEMP,
+            async_set_frost_temp,
+            schema=SERVICE_SET_FROST_TEMP_SCHEMA,
+            supports_response=SupportsResponse.OPTIONAL,
         )
 
     if not hass.services.has_service(COMPONENT_DOMAIN, SERVICE_NEO_UPDATE):
@@ -214,229 +233,186 @@ async def async_setup_entry(hass, entry, async_add_entities):
             COMPONENT_DOMAIN, SERVICE_NEO_UPDATE, async_neo_update)
 
 
-# Helper to find entity
-def find_entity(hass, entity_id):
-    for entity in hass.data[DOMAIN].get("entities", []): # We need to store entities in hass.data to find them easily
-        if entity.entity_id == entity_id:
-            return entity
-    # Fallback to looking up in entity registry if possible, but we need the object instance
-    # The original code used a helper that looked in hass.data[domain] but that was for the old component structure
-    # For now, let's rely on the fact that we can iterate over all climate entities
-    # But wait, we don't have easy access to all climate entities instances from here without storing them.
-    pass
+async def async_dispatch_to_hubs(hass, call, command, args_for):
+    """Send a command to every targeted thermostat, one batch per hub.
+
+    Targets may be entities, areas or devices. Thermostats are grouped by the
+    hub that owns them and each hub gets a single command naming all of its
+    devices; args_for returns the command arguments for a thermostat. Hubs
+    are contacted concurrently and the replies are returned per hub. If no
+    hub accepted its command the call fails, so automations see it.
+    """
+    registry = get_registry(hass)
+    thermostats, _ = registry.resolve(await async_extract_entity_ids(hass, call))
+    for entity_id in cv.ensure_list(call.data.get(ATTR_ENTITY_ID, [])):
+        if registry.get(entity_id) is None:
+            _LOGGER.warning("Thermostat %s not found", entity_id)
+
+    batches = {}
+    for thermostat in thermostats:
+        args = args_for(thermostat)
+        key = (thermostat.coordinator, json.dumps(args, sort_keys=True))
+        batches.setdefault(key, (args, []))[1].append(str(thermostat.name))
+
+    replies = await asyncio.gather(
+        *(
+            coordinator.async_send_batch(command, args, names)
+            for (coordinator, _), (args, names) in batches.items()
+        ),
+        return_exceptions=True,
+    )
 
-# We need to store the entities somewhere to access them in services
-# Let's modify async_setup_entry to store them
-# But wait, the service calls pass entity_id.
-# The best way is to use platform.async_register_entity_service if these were entity services
-# But they are defined as domain services in the original code.
-# Let's try to implement them as entity services if possible, or keep them as domain services but find the entity.
-
-async def get_thermostat(hass, entity_id):
-    """Get thermostat entity."""
-    # This is a bit hacky, but we need to find the entity object
-    # In a proper implementation, we should use entity services
-    # For now, let's try to find it in the state machine? No, we need the object.
-    # We can use hass.data[DOMAIN]['entities'] if we populate it.
-    
-    # Let's populate hass.data[DOMAIN]['entities']
-    if DOMAIN not in hass.data:
-        hass.data[DOMAIN] = {}
-    if 'entities' not in hass.data[DOMAIN]:
-        hass.data[DOMAIN]['entities'] = []
-        
-    for entity in hass.data[DOMAIN]['entities']:
-        if entity.entity_id == entity_id:
-            return entity
-    return None
+    hubs = {}
+    failures = []
+    for ((coordinator, _), (args, names)), reply in zip(batches.items(), replies):
+        hub = hubs.setdefault(coordinator.host, {"devices": [], "replies": []})
+        hub["devices"].extend(names)
+        if isinstance(reply, Exception):
+            _LOGGER.error("%s failed on hub %s: %s", command, coordinator.host, reply)
+            reply = {"error": str(reply)}
+        if isinstance(reply, dict) and "error" in reply:
+            failures.append(f"{coordinator.host}: {reply['error']}")
+        hub["replies"].append(reply)
+    if batches and len(failures) == len(batches):
+        raise HomeAssistantError(f"{command} failed on every hub: {'; '.join(failures)}")
+    return {"command": command, "hubs": hubs}
 
 async def async_handle_hold_temperature_service(hass, call):
     """Handle hold temp service calls."""
-    entity_id = call.data[ATTR_ENTITY_ID]
     hold_temperature = float(call.data["hold_temperature"])
     hold_hours = int(float(call.data["hold_hours"]))
     hold_minutes = int(float(call.data["hold_minutes"]))
-    
-    thermostat = await get_thermostat(hass, entity_id)
-    if not thermostat:
-        _LOGGER.warning("Thermostat %s not found", entity_id)
-        return
-
-    # We need to run network calls in executor
-    await hass.async_add_executor_job(
-        lambda: thermostat.coordinator.hub.json_request({"HOLD":[{"temp":hold_temperature, "id":"hass","hours":hold_hours,"minutes":hold_minutes}, str(thermostat.name)]})
-    )
-    
-    # Force refresh
-    await thermostat.coordinator.async_request_refresh()
+    args = {"temp": hold_temperature, "id": "hass", "hours": hold_hours, "minutes": hold_minutes}
+    return await async_dispatch_to_hubs(hass, call, "HOLD", lambda thermostat: args)
 
 async def async_handle_cancel_hold_service(hass, call):
     """Handle cancel hold service calls."""
-    entity_id = call.data[ATTR_ENTITY_ID]
-    thermostat = await get_thermostat(hass, entity_id)
-    if not thermostat:
-        return
-        
-    hold_temperature = float(thermostat.hold_temperature) if thermostat.hold_temperature else 20.0
-    await hass.async_add_executor_job(
-        lambda: thermostat.coordinator.hub.json_request({"HOLD":[{"temp":hold_temperature, "id":"hass","hours":0,"minutes":0}, str(thermostat.name)]})
+    return await async_dispatch_to_hubs(
+        hass,
+        call,
+        "HOLD",
+        lambda thermostat: {
+            "temp": float(thermostat.hold_temperature) if thermostat.hold_temperature else 20.0,
+            "id": "hass",
+            "hours": 0,
+            "minutes": 0,
+        },
     )
-    
-    # Force refresh
-    await thermostat.coordinator.async_request_refresh()
 
 
 async def async_handle_activate_frost_service(hass, call):
     """Handle activate frost service calls."""
-    entity_id = call.data[ATTR_ENTITY_ID]
-    thermostat = await get_thermostat(hass, entity_id)
-    if not thermostat:
-        return
-
-    await hass.async_add_executor_job(
-        lambda: thermostat.coordinator.hub.json_request({"FROST_ON": str(thermostat.name)})
-    )
-    
-    # Force refresh
-    await thermostat.coordinator.async_request_refresh()
+    return await async_dispatch_to_hubs(hass, call, "FROST_ON", lambda thermostat: None)
 
 async def async_handle_cancel_frost_service(hass, call):
     """Handle cancel frost service calls."""
-    entity_id = call.data[ATTR_ENTITY_ID]
-    thermostat = await get_thermostat(hass, entity_id)
-    if not thermostat:
-        return
-
-    await hass.async_add_executor_job(
-        lambda: thermostat.coordinator.hub.json_request({"FROST_OFF": str(thermostat.name)})
-    )
-    
-    # Force refresh
-    await thermostat.coordinator.async_request_refresh()
+    return await async_dispatch_to_hubs(hass, call, "FROST_OFF", lambda thermostat: None)
 
 async def async_handle_set_frost_temp_service(hass, call):
     """Handle set frost temp service calls."""
-    entity_id = call.data[ATTR_ENTITY_ID]
-    thermostat = await get_thermostat(hass, entity_id)
-    if not thermostat:
-        return
-        
     frost_temperature = float(call.data["frost_temperature"])
-    await hass.async_add_executor_job(
-        lambda: thermostat.coordinator.hub.json_request({"SET_FROST": [frost_temperature, str(thermostat.name)]})
+    return await async_dispatch_to_hubs(
+        hass, call, "SET_FROST", lambda thermostat: frost_temperature
     )
-    
-    # Force refresh
-    await thermostat.coordinator.async_request_refresh()
 
 async def async_handle_neo_update_service(hass, call):
     """Handle neo update service calls."""
-    # Just trigger a refresh on all coordinators?
-    # Or find the coordinator for the entity?
-    # The service doesn't take entity_id in the original code, it was global?
-    # Actually it was taking host/port from config.
-    # Let's just refresh all coordinators we know about.
-    if DOMAIN in hass.data:
-        for entry_id, coordinator in hass.data[DOMAIN].items():
-            if isinstance(coordinator, CoordinatorEntity): # Wait, coordinator is not entity
-                pass
-            if hasattr(coordinator, 'async_request_refresh'):
-                await coordinator.async_request_refresh()
-
-
-class HeatmiserNeostat(CoordinatorEntity, ClimateEntity):
+    # Refresh every hub once, however many entries share it.
+    await asyncio.gather(
+        *(coordinator.async_request_refresh() for coordinator in get_manager(hass).coordinators)
+    )
+
+
+class HeatmiserNeostat(HeatmiserNeoEntity, ClimateEntity):
     """ Represents a Heatmiser Neostat thermostat. """
+
+    _attr_attribution = ATTRIBUTION
+    # Engineers settings rarely change and have their own entities, so the
+    # recorder doesn't store them again with every temperature change.
+    _unrecorded_attributes = frozenset({
+        ATTR_ATTRIBUTION,
+        "frost_temperature",
+        "switching_differential",
+        "output_delay",
+    })
+
+    _neo_fields = frozenset({
+        "celsius",
+        "current_temperature",
+        "set_temperature",
+        "humidity",
+        "heating",
+        "cooling",
+        "cooling_enabled",
+        "temp_hold",
+        "hold_temperature",
+        "hold_time",
+        "standby",
+        "frost_temperature",
+        "switching_differential",
+        "output_delay",
+    })
+
     def __init__(self, coordinator, name):
-        super().__init__(coordinator)
-        self._name = name
-        self._coordinator = coordinator
+        super().__init__(coordinator, name)
         self._hvac_modes = hvac_modes
         self._support_flags = SUPPORT_FLAGS
         self._support_flags = self._support_flags | ClimateEntityFeature.TARGET_TEMPERATURE
-
-    @property
-    def data(self):
-        """Helper to get data for this device."""
-        return self.coordinator.data.get(self._name)
+        self._attr_unique_id = f"{coordinator.host}-{name}"
+        self._attr_name = name
+        self._attributes = None
+        self._attributes_key = None
 
     async def async_added_to_hass(self):
         """Run when entity about to be added."""
         await super().async_added_to_hass()
-        if DOMAIN not in self.hass.data:
-            self.hass.data[DOMAIN] = {}
-        if 'entities' not in self.hass.data[DOMAIN]:
-            self.hass.data[DOMAIN]['entities'] = []
-        self.hass.data[DOMAIN]['entities'].append(self)
+        get_registry(self.hass).add(self)
 
     async def async_will_remove_from_hass(self):
         """Run when entity will be removed."""
         await super().async_will_remove_from_hass()
-        if DOMAIN in self.hass.data and 'entities' in self.hass.data[DOMAIN]:
-            self.hass.data[DOMAIN]['entities'].remove(self)
-
-    @property
-    def unique_id(self):
-        """Return a unique ID."""
-        return f"{self.coordinator.host}-{self._name}"
-
-    @property
-    def device_info(self):
-        """Return device information."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, self.unique_id)},
-            name=self._name,
-            manufacturer="Heatmiser",
-            model="NeoStat",
-            via_device=(DOMAIN, self.coordinator.host),
-        )
+        get_registry(self.hass).remove(self)
 
     @property
     def supported_features(self):
         """Return the list of supported features."""
         return self._support_flags
 
-    @property
-    def name(self):
-        """ Returns the name. """
-        return self._name
-
     @property
     def temperature_unit(self):
         """Return the unit of measurement."""
-        if self.data:
-            tmptempfmt = self.data.get("TEMPERATURE_FORMAT")
-            if (tmptempfmt == False) or (tmptempfmt.upper() == "C"):
-                return UnitOfTemperature.CELSIUS
+        if self.data and self.data.celsius:
+            return UnitOfTemperature.CELSIUS
         return UnitOfTemperature.FAHRENHEIT
 
     @property
     def current_temperature(self):
         """ Returns the current temperature. """
         if self.data:
-            return round(float(self.data.get("CURRENT_TEMPERATURE")), 2)
+            return self.data.current_temperature
         return None
 
     @property
     def target_temperature(self):
         """Return the temperature we try to reach."""
         if self.data:
-            return round(float(self.data.get("CURRENT_SET_TEMPERATURE")), 2)
+            return self.data.set_temperature
         return None
 
     @property
     def current_humidity(self):
         """Return the current humidity."""
         if self.data:
-             return round(float(self.data.get("HUMIDITY")), 2)
+            return self.data.humidity
         return None
 
     @property
     def hvac_action(self):
         """Return current activity ie. currently heating, cooling, idle."""
         if self.data:
-            if self.data.get("HEATING") == True:
+            if self.data.heating:
                 return HVACAction.HEATING
-            elif self.data.get("COOLING") == True:
+            elif self.data.cooling:
                 return HVACAction.COOLING
         return HVACAction.IDLE
 
@@ -444,7 +420,7 @@ class HeatmiserNeostat(CoordinatorEntity, ClimateEntity):
     def hvac_mode(self):
         """Return current operation mode ie. heat, cool, off."""
         if self.data:
-            if self.data.get("COOLING_ENABLED") == True:
+            if self.data.cooling_enabled:
                 return HVACMode.COOL
         return HVACMode.HEAT
 
@@ -457,64 +433,96 @@ class HeatmiserNeostat(CoordinatorEntity, ClimateEntity):
     def on_hold(self):
         """Return if Temp on hold."""
         if self.data:
-            return STATE_ON if self.data.get("TEMP_HOLD") else STATE_OFF
+            return STATE_ON if self.data.temp_hold else STATE_OFF
         return STATE_OFF
 
     @property
     def hold_temperature(self):
         """Return hold temperature."""
         if self.data:
-            return round(float(self.data.get("HOLD_TEMPERATURE")), 2)
+            return self.data.hold_temperature
         return None
 
     @property
     def hold_time(self):
         """Return the current hold time."""
         if self.data:
-            return self.data.get("HOLD_TIME")
+            return self.data.hold_time
         return None
 
     @property
     def on_standby(self):
         """Return if thermostat on standby."""
         if self.data:
-            return STATE_ON if self.data.get("STANDBY") else STATE_OFF
+            return STATE_ON if self.data.standby else STATE_OFF
         return STATE_OFF
 
     @property
     def frost_temperature(self):
         """Return frost temperature."""
-        if self.data and 'engineers_data' in self.data:
-            return round(float(self.data['engineers_data'].get("FROST TEMPERATURE")), 2)
+        if self.data:
+            return self.data.frost_temperature
         return None
         
     @property
     def switching_differential(self):
         """Return Switching Differential."""
-        if self.data and 'engineers_data' in self.data:
-            return round(float(self.data['engineers_data'].get("SWITCHING DIFFERENTIAL")), 2)
+        if self.data:
+            return self.data.switching_differential
         return None
 
     @property
     def output_delay(self):
         """Return frost temperature."""
-        if self.data and 'engineers_data' in self.data:
-            return round(float(self.data['engineers_data'].get("OUTPUT DELAY")), 2)
+        if self.data:
+            return self.data.output_delay
+        return None
+
+    @property
+    def next_setpoint(self):
+        """Return the setpoint of the next scheduled change."""
+        if change := self.coordinator.next_schedule_change(self._name):
+            return change[1]
+        return None
+
+    @property
+    def next_change_at(self):
+        """Return when the next scheduled change happens."""
+        if change := self.coordinator.next_schedule_change(self._name):
+            return change[0].isoformat()
         return None
 
     @property
     def extra_state_attributes(self):
-        """Return the state attributes."""
-        return {
-            ATTR_ATTRIBUTION: ATTRIBUTION,
-            "on_hold": self.on_hold,
-            "hold_temperature": self.hold_temperature,
-            "hold_time": self.hold_time,
-            "on_standby": self.on_standby,
-            "frost_temperature": self.frost_temperature,
-            "switching_differential": self.switching_differential,
-            "output_delay": self.output_delay,
-        }
+        """Return the state attributes, rebuilt only when one of them changed."""
+        data = self.data
+        change = self.coordinator.next_schedule_change(self._name)
+        key = (
+            change,
+            None if data is None else (
+                data.temp_hold,
+                data.hold_temperature,
+                data.hold_time,
+                data.standby,
+                data.frost_temperature,
+                data.switching_differential,
+                data.output_delay,
+            ),
+        )
+        if key != self._attributes_key:
+            self._attributes_key = key
+            self._attributes = {
+                "on_hold": self.on_hold,
+                "hold_temperature": self.hold_temperature,
+                "hold_time": self.hold_time,
+                "on_standby": self.on_standby,
+                "frost_temperature": self.frost_temperature,
+                "switching_differential": self.switching_differential,
+                "output_delay": self.output_delay,
+                "next_setpoint": self.next_setpoint,
+                "next_change_at": self.next_change_at,
+            }
+        return self._attributes
 
     def set_temperature(self, **kwargs):
         """ Set new target temperature. """
@@ -523,12 +531,9 @@ class HeatmiserNeostat(CoordinatorEntity, ClimateEntity):
         
     async def async_set_temperature(self, **kwargs):
         """ Set new target temperature. """
-        await self.hass.async_add_executor_job(
-            lambda: self.coordinator.hub.json_request({"SET_TEMP": [float(kwargs.get(ATTR_TEMPERATURE)), self._name]})
+        await self.coordinator.async_send_command(
+            "SET_TEMP", float(kwargs.get(ATTR_TEMPERATURE)), self._name
         )
-            
-        # Force refresh
-        await self.coordinator.async_request_refresh()
 
     def set_temperature_e(self, **kwargs):
         """ Set new target temperature. """
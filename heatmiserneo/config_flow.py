@@ -3,18 +3,32 @@ import logging
 import voluptuous as vol
 
 from homeassistant import config_entries
+from homeassistant.components import network
 from homeassistant.const import CONF_HOST, CONF_PORT
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 
-from .const import DOMAIN
+from .const import (
+    CONF_ENGINEERS_INTERVAL,
+    CONF_LIVE_MODE,
+    DEFAULT_ENGINEERS_INTERVAL,
+    DEFAULT_LIVE_MODE,
+    DOMAIN,
+)
+from .discovery import (
+    DEFAULT_PORT,
+    async_probe_hub,
+    async_scan,
+    firmware_version,
+    scan_targets,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
 DATA_SCHEMA = vol.Schema(
     {
         vol.Required(CONF_HOST): str,
-        vol.Required(CONF_PORT, default=4242): int,
+        vol.Required(CONF_PORT, default=DEFAULT_PORT): int,
     }
 )
 
@@ -23,26 +37,94 @@ class HeatmiserNeoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: config_entries.ConfigEntry):
+        """Get the options flow for this handler."""
+        return HeatmiserNeoOptionsFlow()
+
+    def __init__(self):
+        """Initialize."""
+        self._discovered: dict[str, str] = {}
+
     async def async_step_user(self, user_input=None) -> FlowResult:
         """Handle the initial step."""
+        return self.async_show_menu(step_id="user", menu_options=["discover", "manual"])
+
+    async def async_step_discover(self, user_input=None) -> FlowResult:
+        """Offer the hubs found on the local network."""
+        if user_input is not None:
+            return await self._async_create_hub_entry(
+                {CONF_HOST: user_input[CONF_HOST], CONF_PORT: DEFAULT_PORT}
+            )
+
+        configured = {entry.data[CONF_HOST] for entry in self._async_current_entries()}
+        hosts = [host for host in await self._async_scan_targets() if host not in configured]
+        found = await async_scan(hosts)
+        self._discovered = {
+            host: f"{host} (firmware {version})" if (version := firmware_version(reply)) else host
+            for host, reply in sorted(found.items())
+        }
+        if not self._discovered:
+            return self.async_show_form(
+                step_id="manual", data_schema=DATA_SCHEMA, errors={"base": "no_hubs_found"}
+            )
+
+        return self.async_show_form(
+            step_id="discover",
+            data_schema=vol.Schema({vol.Required(CONF_HOST): vol.In(self._discovered)}),
+        )
+
+    async def async_step_manual(self, user_input=None) -> FlowResult:
+        """Handle a hub entered by address."""
         errors = {}
         if user_input is not None:
-            # Validate the connection here if possible
-            # For now, we just create the entry
-            return self.async_create_entry(title="Heatmiser Neo", data=user_input)
+            if await async_probe_hub(user_input[CONF_HOST], user_input[CONF_PORT]) is None:
+                errors["base"] = "cannot_connect"
+            else:
+                return await self._async_create_hub_entry(user_input)
 
         return self.async_show_form(
-            step_id="user", data_schema=DATA_SCHEMA, errors=errors
+            step_id="manual",
+            data_schema=self.add_suggested_values_to_schema(DATA_SCHEMA, user_input),
+            errors=errors,
         )
 
+    async def _async_create_hub_entry(self, data) -> FlowResult:
+        """Create the entry for a hub unless it is configured already."""
+        # One entry per hub, entries for the same hub would poll it twice.
+        self._async_abort_entries_match({CONF_HOST: data[CONF_HOST], CONF_PORT: data[CONF_PORT]})
+        return self.async_create_entry(title="Heatmiser Neo", data=data)
+
+    async def _async_scan_targets(self):
+        """Return the addresses on the networks Home Assistant is attached to."""
+        interfaces = [
+            (ipv4["address"], ipv4["network_prefix"])
+            for adapter in await network.async_get_adapters(self.hass)
+            if adapter["enabled"]
+            for ipv4 in adapter["ipv4"]
+        ]
+        return scan_targets(interfaces)
+
     async def async_step_reconfigure(self, user_input: dict[str, any] = None) -> FlowResult:
         """Handle a reconfiguration flow initialized by the user."""
         errors = {}
         if user_input is not None:
-            return self.async_update_reload_and_abort(
-                self._get_reconfigure_entry(),
-                data_updates=user_input,
-            )
+            entry = self._get_reconfigure_entry()
+            if any(
+                other.data[CONF_HOST] == user_input[CONF_HOST]
+                and other.data[CONF_PORT] == user_input[CONF_PORT]
+                for other in self._async_current_entries(include_ignore=False)
+                if other.entry_id != entry.entry_id
+            ):
+                return self.async_abort(reason="already_configured")
+            if await async_probe_hub(user_input[CONF_HOST], user_input[CONF_PORT]) is None:
+                errors["base"] = "cannot_connect"
+            else:
+                return self.async_update_reload_and_abort(
+                    entry,
+                    data_updates=user_input,
+                )
 
         return self.async_show_form(
             step_id="reconfigure",
@@ -51,3 +133,27 @@ class HeatmiserNeoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             ),
             errors=errors,
         )
+
+
+class HeatmiserNeoOptionsFlow(config_entries.OptionsFlow):
+    """Handle Heatmiser Neo options."""
+
+    async def async_step_init(self, user_input=None) -> FlowResult:
+        """Manage options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = {
+            vol.Optional(
+                CONF_ENGINEERS_INTERVAL,
+                default=self.config_entry.options.get(
+                    CONF_ENGINEERS_INTERVAL, DEFAULT_ENGINEERS_INTERVAL
+                ),
+            ): vol.All(int, vol.Range(min=1, max=1440)),
+            vol.Optional(
+                CONF_LIVE_MODE,
+                default=self.config_entry.options.get(CONF_LIVE_MODE, DEFAULT_LIVE_MODE),
+            ): bool,
+        }
+
+        return self.async_show_form(step_id="init", data_schema=vol.Schema(options))
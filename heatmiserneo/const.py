@@ -1,3 +1,17 @@
 """Constants for the Heatmiser Neo integration."""
 
 DOMAIN = "heatmiserneo"
+
+# DEVICE_TYPE of NeoPlugs in INFO; every other type is a thermostat.
+DEVICE_TYPE_PLUG = 6
+
+CONF_ENGINEERS_INTERVAL = "engineers_data_interval"
+
+# Engineers data (frost temperature, differential, output delay) rarely
+# changes, so by default it is only re-read every 10 minutes.
+DEFAULT_ENGINEERS_INTERVAL = 10
+
+CONF_LIVE_MODE = "live_mode"
+
+# Live mode asks the hub for changes every few seconds instead of polling it.
+DEFAULT_LIVE_MODE = False
@@ -1,108 +1,517 @@
 """DataUpdateCoordinator for Heatmiser Neo."""
 import logging
-import socket
-import json
-from datetime import timedelta
+import random
+import time
+from datetime import datetime, timedelta
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later, async_track_point_in_time
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN
+from .const import DEFAULT_ENGINEERS_INTERVAL, DOMAIN
+from .history import NeoDeviceHistory
+from .hub import HeatmiserNeoCommandQueue, HeatmiserNeoError, HeatmiserNeoHub
+from .models import NeoDeviceState
+from .schedule import NeoSchedule
+from .scheduler import HeatmiserNeoPollScheduler
 
 _LOGGER = logging.getLogger(__name__)
 
 SCAN_INTERVAL = timedelta(seconds=30)
 
+# Polling slows down when nothing is happening and speeds up while a zone
+# is heating, a hold is counting down or a write was made recently.
+FAST_SCAN_INTERVAL = timedelta(seconds=10)
+IDLE_SCAN_INTERVAL = timedelta(minutes=5)
+RECENT_WRITE_WINDOW = timedelta(minutes=2)
+# Zones this close (degrees) above their target may start heating soon.
+HEATING_MARGIN = 0.5
+# Without a scheduler, intervals are spread by up to this fraction so hubs
+# don't poll in lockstep.
+SCAN_JITTER = 0.1
+
+# In live mode the hub is asked whether anything changed this often, and
+# only read in full when it did.
+LIVE_PROBE_INTERVAL = timedelta(seconds=5)
+
+# The last good snapshot of each hub is kept in .storage so entities can be
+# created from it at startup; writes are coalesced over this many seconds.
+SNAPSHOT_STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 60
+
+# While the hub doesn't answer, the last good data is kept, marked stale,
+# for this long before the entities become unavailable.
+STALE_TOLERANCE = timedelta(minutes=5)
+
+# Comfort level schedules are re-read this often, or as soon as the hub
+# reports a profile change in live mode.
+PROFILE_INTERVAL = timedelta(hours=1)
+
+# How long after a write the hub is polled to confirm it; until then the
+# expected values are kept on top of whatever a regular poll returns.
+CONFIRM_DELAY = timedelta(seconds=5)
+
+
+def _hold_changes(args):
+    """Return the expected device values after a HOLD command.
+
+    hold_time is formatted like the hub reports it ("1:30"), so the
+    confirming poll doesn't count as a change.
+    """
+    if args["hours"] or args["minutes"]:
+        return {
+            "temp_hold": True,
+            "hold_temperature": float(args["temp"]),
+            "hold_time": f"{args['hours']}:{args['minutes']:02d}",
+            "set_temperature": float(args["temp"]),
+        }
+    return {"temp_hold": False, "hold_time": "0:00"}
+
+
+# Expected device values after each write, built from the command arguments.
+OPTIMISTIC_CHANGES = {
+    "SET_TEMP": lambda temp: {"set_temperature": float(temp)},
+    "FROST_ON": lambda _: {"standby": True},
+    "FROST_OFF": lambda _: {"standby": False},
+    "HOLD": _hold_changes,
+    "SET_FROST": lambda temp: {"frost_temperature": float(temp)},
+    "TIMER_ON": lambda _: {"timer_on": True},
+    "TIMER_OFF": lambda _: {"timer_on": False},
+}
+
+
+def snapshot_store(hass: HomeAssistant, host: str, port: int) -> Store:
+    """Return the store holding the last good snapshot of a hub."""
+    return Store(hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.snapshot.{host}_{port}")
+
+
+def _may_heat_soon(device):
+    """Return True if a zone is active and close to calling for heat."""
+    if device.standby or device.is_plug:
+        return False
+    if device.current_temperature is None or device.set_temperature is None:
+        return True
+    return device.current_temperature <= device.set_temperature + HEATING_MARGIN
+
+
 class HeatmiserNeoCoordinator(DataUpdateCoordinator):
     """Class to manage fetching Heatmiser Neo data."""
 
-    def __init__(self, hass: HomeAssistant, host: str, port: int):
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        host: str,
+        port: int,
+        engineers_interval: int = DEFAULT_ENGINEERS_INTERVAL,
+        live_mode: bool = False,
+        scheduler: HeatmiserNeoPollScheduler | None = None,
+    ):
         """Initialize."""
         self.host = host
         self.port = port
-        self.hub = HeatmiserNeoHub(host, port)
+        self.hub = HeatmiserNeoHub(
+            host,
+            port,
+            engineers_interval=timedelta(minutes=engineers_interval).total_seconds(),
+            limiter=scheduler.limiter if scheduler is not None else None,
+        )
+        # Places the polls of this hub between those of the other hubs.
+        self._scheduler = scheduler
+        if scheduler is not None:
+            scheduler.register((host, port), self.hub.stats)
+        self.commands = HeatmiserNeoCommandQueue(self.hub, on_flush=self._async_commands_sent)
+        self._device_listeners: dict[str, list[CALLBACK_TYPE]] = {}
+        self._optimistic: dict[str, dict] = {}
+        self._confirm_unsub: CALLBACK_TYPE | None = None
+        # Fields that changed per device in the last poll, None if unknown.
+        self._changes: dict[str, frozenset[str]] | None = None
+        self._last_write: float | None = None
+        self.live_mode = live_mode
+        # Change token of the hub state the current data was read at.
+        self._live_token: bytes | None = None
+        self._store = snapshot_store(hass, host, port)
+        # Devices as read from the hub, without optimistic values.
+        self._snapshot: dict[str, NeoDeviceState] = {}
+        # True while a delayed save of the snapshot is scheduled.
+        self._save_pending = False
+        # Recent samples of each device, for trend sensors.
+        self.history: dict[str, NeoDeviceHistory] = {}
+        self.schedules: dict[str, NeoSchedule] = {}
+        self._schedule_zones: frozenset[str] = frozenset()
+        self._schedule_generation: int | None = None
+        self._schedules_read_at: float | None = None
+        self._next_changes: dict[str, datetime] = {}
+        self._schedule_unsub: CALLBACK_TYPE | None = None
+        # When the hub stopped answering, None while the data is current.
+        self.stale_since: datetime | None = None
 
         super().__init__(
             hass,
             _LOGGER,
+            # Shared by entries, so its lifetime belongs to the hub manager
+            # rather than to the entry that happened to create it.
+            config_entry=None,
             name=DOMAIN,
             update_interval=SCAN_INTERVAL,
+            always_update=False,
         )
 
     async def _async_update_data(self):
-        """Fetch data from API endpoint."""
+        """Fetch data from API endpoint, timing the poll."""
+        started = time.perf_counter()
+        data = None
         try:
-            return await self.hass.async_add_executor_job(self.hub.update)
+            data = await self._async_poll()
+        finally:
+            self.hub.stats.record_poll(
+                (time.perf_counter() - started) * 1000,
+                data is not None and self.stale_since is None,
+            )
+        if data and self.stale_since is None:
+            now = self.hass.loop.time()
+            for name, device in data.items():
+                if (history := self.history.get(name)) is None:
+                    history = self.history[name] = NeoDeviceHistory()
+                history.add(now, device.current_temperature, device.set_temperature, device.heating)
+            await self._async_refresh_schedules(data)
+        # Picked last, as the refresh is scheduled from the end of the update.
+        self.update_interval = self._next_interval(data)
+        return data
+
+    async def _async_poll(self):
+        """Read the hub, or only check it for changes in live mode."""
+        self._changes = None
+        token = None
+        try:
+            if self.live_mode:
+                token = await self.hub.probe()
+                if self.hub.live_supported is False:
+                    _LOGGER.warning(
+                        "Hub %s doesn't support live updates, polling it instead", self.host
+                    )
+                    self.live_mode = False
+                elif token is not None and token == self._live_token and self.data:
+                    # Nothing changed on the hub, keep the current data.
+                    self.hub.stats.unchanged_probes += 1
+                    self._changes = {}
+                    return self.data
+            devices = await self.hub.update()
+        except HeatmiserNeoError as err:
+            _LOGGER.debug("Skipping poll of %s: %s", self.host, err)
+            devices = None
         except Exception as err:
             raise UpdateFailed(f"Error communicating with API: {err}")
 
-class HeatmiserNeoHub:
-    """Heatmiser Neo Hub API."""
+        if devices is None:
+            return self._stale_data()
+        if self.stale_since is not None:
+            _LOGGER.info("Hub %s is answering again", self.host)
+            self.stale_since = None
+        # Kept only once the full read succeeded. Taken before it, so a
+        # change made during the read is picked up by the next probe.
+        self._live_token = token
 
-    def __init__(self, host, port):
-        """Initialize."""
-        self._host = host
-        self._port = port
+        data = {
+            name: NeoDeviceState.from_info(device, device.get("engineers_data"))
+            for name, device in devices.items()
+        }
+        if data != self._snapshot:
+            self._snapshot = data
+            # Scheduling again would restart the delay, and with frequent
+            # polls postpone the save until shutdown; the pending save
+            # writes whatever the snapshot is by then.
+            if not self._save_pending:
+                self._save_pending = True
+                self._store.async_delay_save(self._snapshot_to_save, SNAPSHOT_SAVE_DELAY)
+        data = dict(data)
+        # Don't let a poll that raced a write undo its expected values.
+        for name, changes in self._optimistic.items():
+            if name in data:
+                data[name] = data[name].replace(**changes)
+
+        if data and self.data:
+            self._changes = {
+                name: device.diff(self.data.get(name)) for name, device in data.items()
+            }
 
-    def update(self):
-        """Get the latest data."""
-        response = self.json_request({"INFO": 0})
-        if not response:
-            return None
-        
-        # We also need engineers data for some attributes
-        eng_response = self.json_request({"ENGINEERS_DATA": 0})
-        
-        # Merge data or structure it nicely
-        # The current climate implementation expects a list of devices from INFO
-        # and then looks up engineers data.
-        # Let's return a dictionary keyed by device name for easier access
-        
-        data = {}
-        if response and 'devices' in response:
-            for device in response['devices']:
-                name = device['device']
-                data[name] = device
-                # Add engineers data if available
-                if eng_response and name in eng_response:
-                    data[name]['engineers_data'] = eng_response[name]
-        
         return data
 
-    def json_request(self, request):
-        """Communicate with the json server."""
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(5)
+    def _stale_data(self):
+        """Return the last good data while the hub is briefly unreachable.
+
+        Keeping it, rather than failing the update, spares every entity a
+        trip to unavailable and back when a single poll is lost.
+        """
+        now = dt_util.utcnow()
+        if self.stale_since is None:
+            self.stale_since = now
+        # The data is not what the hub held at any token, read it in full next time.
+        self._live_token = None
+        if not self.data or now - self.stale_since > STALE_TOLERANCE:
+            raise UpdateFailed(f"Hub {self.host} has not answered since {self.stale_since}")
+        self._changes = {}
+        return self.data
 
+    async def async_restore_snapshot(self) -> bool:
+        """Load the last good snapshot as the current data.
+
+        Returns False if there is none, so the hub has to be read first.
+        """
         try:
-            sock.connect((self._host, self._port))
-        except OSError:
-            sock.close()
-            return None
+            stored = await self._store.async_load()
+        except Exception as err:
+            _LOGGER.warning("Ignoring the stored snapshot of hub %s: %s", self.host, err)
+            return False
+        if not stored or not stored.get("devices"):
+            return False
+        self._snapshot = {
+            device["name"]: NeoDeviceState.from_dict(device) for device in stored["devices"]
+        }
+        self.data = dict(self._snapshot)
+        return True
+
+    @callback
+    def _snapshot_to_save(self):
+        """Return the snapshot in the stored format."""
+        self._save_pending = False
+        return {"devices": [device.as_dict() for device in self._snapshot.values()]}
+
+    async def _async_refresh_schedules(self, data):
+        """Re-read the comfort levels of the zones if they may have changed."""
+        zones = frozenset(
+            name
+            for name, device in data.items()
+            if not device.has_timer
+        )
+        now = self.hass.loop.time()
+        if (
+            zones == self._schedule_zones
+            and self._schedule_generation == self.hub.profile_generation
+            and self._schedules_read_at is not None
+            and now - self._schedules_read_at < PROFILE_INTERVAL.total_seconds()
+        ):
+            return
+        # Set before reading, so a failed read waits for the next interval.
+        self._schedule_zones = zones
+        self._schedule_generation = self.hub.profile_generation
+        self._schedules_read_at = now
+        if not zones:
+            return
 
-        sock.send(bytearray(json.dumps(request) + "\0\r", "utf-8"))
         try:
-            buf = sock.recv(4096)
-        except socket.timeout:
-            sock.close()
+            levels = await self.hub.read_comfort_levels(sorted(zones))
+        except Exception as err:
+            _LOGGER.debug("Unable to read comfort levels from %s: %s", self.host, err)
+            return
+        if levels is None:
+            return
+        self.schedules = {
+            name: NeoSchedule.from_comfort_levels(levels[name])
+            for name in zones
+            if isinstance(levels.get(name), dict)
+        }
+        self._async_track_schedules()
+
+    def next_schedule_change(self, name):
+        """Return (time, setpoint) of the next scheduled change of a zone, or None."""
+        if not (schedule := self.schedules.get(name)):
             return None
+        return schedule.next_change(dt_util.now())
+
+    @callback
+    def _async_track_schedules(self):
+        """Wake up at the next scheduled change of any zone."""
+        if self._schedule_unsub is not None:
+            self._schedule_unsub()
+            self._schedule_unsub = None
+        now = dt_util.now()
+        self._next_changes = {
+            name: change[0]
+            for name, schedule in self.schedules.items()
+            if (change := schedule.next_change(now)) is not None
+        }
+        if self._next_changes:
+            self._schedule_unsub = async_track_point_in_time(
+                self.hass, self._async_schedule_reached, min(self._next_changes.values())
+            )
+
+    @callback
+    def _async_schedule_reached(self, now):
+        """Update the zones whose scheduled change was reached."""
+        self._schedule_unsub = None
+        due = [name for name, when in self._next_changes.items() if when <= now]
+        self._async_track_schedules()
+        for name in due:
+            self._async_notify_device(name)
+
+    def _next_interval(self, data):
+        """Pick the polling interval for the state the hub is in."""
+        if self.live_mode:
+            return self._spread(LIVE_PROBE_INTERVAL)
+        devices = (data or {}).values()
+        recent_write = (
+            self._last_write is not None
+            and self.hass.loop.time() - self._last_write
+            < RECENT_WRITE_WINDOW.total_seconds()
+        )
+        if recent_write or any(
+            device.heating or device.temp_hold for device in devices
+        ):
+            interval = FAST_SCAN_INTERVAL
+        elif any(_may_heat_soon(device) for device in devices):
+            interval = SCAN_INTERVAL
+        else:
+            interval = IDLE_SCAN_INTERVAL
+        return self._spread(interval)
+
+    def _spread(self, interval):
+        """Move a poll so hubs don't all poll at once.
+
+        With a scheduler the poll goes to this hub's slot of the interval,
+        otherwise it is jittered.
+        """
+        if self._scheduler is None:
+            return interval * random.uniform(1 - SCAN_JITTER, 1 + SCAN_JITTER)
+        return timedelta(
+            seconds=self._scheduler.next_interval(
+                (self.host, self.port), interval.total_seconds(), self.hass.loop.time()
+            )
+        )
+
+    def set_engineers_interval(self, engineers_interval):
+        """Change how often (minutes) engineers data is re-read."""
+        self.hub.set_engineers_interval(timedelta(minutes=engineers_interval).total_seconds())
+
+    def set_live_mode(self, live_mode):
+        """Switch between live updates and adaptive polling."""
+        if live_mode != self.live_mode:
+            self.live_mode = live_mode
+            self._live_token = None
+            self.update_interval = self._next_interval(self.data)
+
+    def device_changed(self, name, fields=None):
+        """Return True if any of the device fields changed in the last poll.
+
+        fields is the set of fields an entity shows, None for all of them.
+        """
+        if self._changes is None:
+            return True
+        changed = self._changes.get(name)
+        if not changed:
+            return False
+        return fields is None or not changed.isdisjoint(fields)
+
+    @callback
+    def async_add_device_listener(self, name, update_callback) -> CALLBACK_TYPE:
+        """Listen for optimistic changes to a single device."""
+        listeners = self._device_listeners.setdefault(name, [])
+        listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_apply_optimistic(self, command, args, device):
+        """Apply the expected result of a write and notify that device only."""
+        if command not in OPTIMISTIC_CHANGES or not self.data or device not in self.data:
+            return
+
+        changes = OPTIMISTIC_CHANGES[command](args)
+        self._optimistic.setdefault(device, {}).update(changes)
+        self.data[device] = self.data[device].replace(**changes)
+        self._async_notify_device(device)
+
+    @callback
+    def _async_notify_device(self, name):
+        """Call the listeners of a single device."""
+        for update_callback in list(self._device_listeners.get(name, ())):
+            update_callback()
+
+    async def async_send_command(self, command, args, device):
+        """Queue a write for a device, confirming it with a poll once sent.
+
+        args is None for commands that only take device names (FROST_ON),
+        otherwise it is the value sent ahead of the device list (SET_TEMP).
+        Fails straight away while the hub is not responding, and takes the
+        expected values back if the hub doesn't answer.
+        """
+        self._raise_if_unavailable()
+        self._last_write = self.hass.loop.time()
+        self.async_apply_optimistic(command, args, device)
+        try:
+            reply = await self.commands.send(command, args, device)
+        except HeatmiserNeoError as err:
+            self._async_revert_optimistic([device])
+            raise HomeAssistantError(str(err)) from err
+        if reply is None:
+            self._async_revert_optimistic([device])
+            raise HomeAssistantError(f"Heatmiser Neo hub {self.host} didn't answer {command}")
+        return reply
+
+    async def async_send_batch(self, command, args, devices):
+        """Send one command to several devices right away and return the reply."""
+        self._raise_if_unavailable()
+        self._last_write = self.hass.loop.time()
+        for device in devices:
+            self.async_apply_optimistic(command, args, device)
+        try:
+            reply = await self.commands.send_batch(command, args, devices)
+        except HeatmiserNeoError as err:
+            self._async_revert_optimistic(devices)
+            raise HomeAssistantError(str(err)) from err
+        if reply is None:
+            self._async_revert_optimistic(devices)
+            raise HomeAssistantError(f"Heatmiser Neo hub {self.host} didn't answer {command}")
+        return reply
+
+    @callback
+    def _async_revert_optimistic(self, devices):
+        """Show the devices as last read from the hub again after a failed write."""
+        for device in devices:
+            self._optimistic.pop(device, None)
+            if self.data and device in self.data and device in self._snapshot:
+                self.data[device] = self._snapshot[device]
+                self._async_notify_device(device)
+
+    def _raise_if_unavailable(self):
+        """Refuse writes while the circuit to the hub is open."""
+        if self.hub.breaker.is_open:
+            raise HomeAssistantError(f"Heatmiser Neo hub {self.host} is not responding")
+
+    async def _async_commands_sent(self):
+        """Schedule a single confirmation poll after a batch of writes."""
+        if self._confirm_unsub is not None:
+            self._confirm_unsub()
+        self._confirm_unsub = async_call_later(self.hass, CONFIRM_DELAY, self._async_confirm)
+
+    async def _async_confirm(self, _now):
+        """Poll the hub to confirm the values set optimistically."""
+        self._confirm_unsub = None
+        written = list(self._optimistic)
+        self._optimistic.clear()
+        # Read the hub in full even if a write it ignored left it unchanged.
+        self._live_token = None
+        await self.async_refresh()
+        # Without an answer the stale data would keep the unconfirmed values.
+        if self.stale_since is not None:
+            self._async_revert_optimistic(written)
 
-        buffering = True
-        while buffering:
-            if "\n" in str(buf, "utf-8"):
-                response = str(buf, "utf-8").split("\n")[0]
-                buffering = False
-            else:
-                try:
-                    more = sock.recv(4096)
-                except socket.timeout:
-                    more = None
-                if not more:
-                    buffering = False
-                    response = str(buf, "utf-8")
-                else:
-                    buf += more
-
-        sock.close()
-        response = response.rstrip('\0')
-        return json.loads(response, strict=False)
+    async def async_shutdown(self) -> None:
+        """Cancel pending work and close the hub connection."""
+        await super().async_shutdown()
+        if self._confirm_unsub is not None:
+            self._confirm_unsub()
+            self._confirm_unsub = None
+        if self._schedule_unsub is not None:
+            self._schedule_unsub()
+            self._schedule_unsub = None
+        if self._scheduler is not None:
+            self._scheduler.unregister((self.host, self.port))
+        await self.commands.close()
+        await self.hub.close()
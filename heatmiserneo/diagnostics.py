@@ -0,0 +1,33 @@
+"""Diagnostics support for Heatmiser Neo."""
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .manager import get_manager
+
+TO_REDACT = {CONF_HOST}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval": str(coordinator.update_interval),
+            "live_mode": coordinator.live_mode,
+            "live_supported": coordinator.hub.live_supported,
+            "stale_since": coordinator.stale_since,
+            "circuit_open": coordinator.hub.breaker.is_open,
+            "consecutive_failures": coordinator.hub.breaker.failures,
+            "circuit_opens": coordinator.hub.breaker.opens,
+        },
+        "link": coordinator.hub.stats.as_dict(),
+        "scheduler": get_manager(hass).scheduler.as_dict(),
+        "devices": {
+            name: device.as_dict() for name, device in (coordinator.data or {}).items()
+        },
+    }
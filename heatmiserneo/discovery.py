@@ -0,0 +1,84 @@
+"""Finding Heatmiser Neo hubs on the local network."""
+import asyncio
+import ipaddress
+import json
+import logging
+
+from .hub import NeoFrameBuffer
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_PORT = 4242
+
+# Total time (seconds) a host gets to accept a connection and answer.
+PROBE_TIMEOUT = 1.0
+
+# Hosts probed at once; a /24 is two rounds of PROBE_TIMEOUT at worst.
+SCAN_CONCURRENCY = 128
+
+# Networks larger than this are only scanned around our own address.
+MAX_SCAN_PREFIX = 24
+
+_HELLO = b'{"FIRMWARE": 0}\0\r'
+
+
+async def async_probe_hub(host, port=DEFAULT_PORT, timeout=PROBE_TIMEOUT):
+    """Return the FIRMWARE reply of a hub, or None if host doesn't answer as one."""
+    writer = None
+    try:
+        async with asyncio.timeout(timeout):
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(_HELLO)
+            frames = NeoFrameBuffer()
+            while not (replies := frames.feed(await reader.read(4096))):
+                if reader.at_eof():
+                    replies = [frame] if (frame := frames.flush()) else []
+                    break
+        reply = json.loads(replies[0], strict=False) if replies else None
+    except (OSError, TimeoutError, ValueError) as err:
+        _LOGGER.debug("No hub at %s:%s: %s", host, port, err)
+        return None
+    finally:
+        if writer is not None:
+            writer.close()
+    return reply if isinstance(reply, dict) else None
+
+
+def scan_targets(interfaces):
+    """Return the hosts to probe for the given interfaces.
+
+    interfaces is an iterable of (address, prefix length) pairs; networks
+    larger than MAX_SCAN_PREFIX are narrowed to the block around address.
+    """
+    hosts = {}
+    for address, prefix in interfaces:
+        network = ipaddress.ip_interface(f"{address}/{max(prefix, MAX_SCAN_PREFIX)}").network
+        if network.is_loopback or network.is_link_local:
+            continue
+        for host in network.hosts():
+            if str(host) != address:
+                hosts[str(host)] = None
+    return list(hosts)
+
+
+async def async_scan(hosts, port=DEFAULT_PORT, concurrency=SCAN_CONCURRENCY):
+    """Probe hosts concurrently and return {host: FIRMWARE reply} for the hubs found."""
+    limit = asyncio.Semaphore(concurrency)
+
+    async def probe(host):
+        async with limit:
+            return host, await async_probe_hub(host, port)
+
+    found = {}
+    for host, reply in await asyncio.gather(*(probe(host) for host in hosts)):
+        if reply is not None:
+            found[host] = reply
+    return found
+
+
+def firmware_version(reply):
+    """Return the firmware version in a FIRMWARE reply, or None."""
+    for key, value in reply.items():
+        if "VERSION" in key.upper() or key.upper() == "FIRMWARE":
+            return str(value)
+    return None
@@ -0,0 +1,61 @@
+"""Base entity for Heatmiser Neo devices."""
+from homeassistant.core import callback
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+
+
+def hub_device_info(coordinator):
+    """Return device information of the hub itself."""
+    return DeviceInfo(
+        identifiers={(DOMAIN, coordinator.host)},
+        name=f"Heatmiser Neo hub ({coordinator.host})",
+        manufacturer="Heatmiser",
+        model="neoHub",
+    )
+
+
+class HeatmiserNeoEntity(CoordinatorEntity):
+    """Represents one aspect of a device attached to a Heatmiser Neo hub."""
+
+    # Device fields the entity shows, None if it depends on all of them.
+    _neo_fields = None
+
+    def __init__(self, coordinator, name):
+        super().__init__(coordinator)
+        self._name = name
+        self._coordinator = coordinator
+        self._was_available = True
+        device = coordinator.data.get(name) if coordinator.data else None
+        # Built once; entities of a hub can number in the hundreds.
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"{coordinator.host}-{name}")},
+            name=name,
+            manufacturer="Heatmiser",
+            model="NeoPlug" if device is not None and device.is_plug else "NeoStat",
+            via_device=(DOMAIN, coordinator.host),
+        )
+
+    @property
+    def data(self):
+        """Helper to get data for this device."""
+        return self.coordinator.data.get(self._name)
+
+    async def async_added_to_hass(self):
+        """Run when entity about to be added."""
+        await super().async_added_to_hass()
+        # Writes update only the entities of the device they were made to.
+        self.async_on_remove(
+            self.coordinator.async_add_device_listener(self._name, self.async_write_ha_state)
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only if availability or a field it shows changed."""
+        available = self.coordinator.last_update_success
+        if available != self._was_available or self.coordinator.device_changed(
+            self._name, self._neo_fields
+        ):
+            self._was_available = available
+            super()._handle_coordinator_update()
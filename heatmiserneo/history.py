@@ -0,0 +1,196 @@
+"""Recent temperature history of Heatmiser Neo devices."""
+from array import array
+
+# Samples kept per device, at least HISTORY_SPACING seconds apart, which
+# covers the longest window below.
+HISTORY_SIZE = 360
+HISTORY_SPACING = 30
+
+# The rate of change is a least squares fit over this many seconds...
+RATE_WINDOW = 30 * 60
+# ...once the samples in it span at least this long.
+RATE_MIN_SPAN = 10 * 60
+
+# The heating duty cycle is measured over this many seconds.
+DUTY_WINDOW = 3 * 60 * 60
+
+_SECONDS_PER_HOUR = 3600
+
+
+class NeoDeviceHistory:
+    """Fixed-size ring of (time, temperature, target, heating) samples.
+
+    Rate of change and duty cycle are kept as running sums over sliding
+    windows of the ring. Adding a sample updates them and drops the samples
+    that left each window, so every sample is added and removed once and
+    reading a value is O(1).
+
+    Sample positions are counted from the first sample ever added; the ring
+    slot of position i is i % HISTORY_SIZE.
+    """
+
+    __slots__ = (
+        "_times",
+        "_temperatures",
+        "_targets",
+        "_heating",
+        "_spans",
+        "_end",
+        "_origin",
+        "_rate_start",
+        "_n",
+        "_sum_x",
+        "_sum_y",
+        "_sum_xx",
+        "_sum_xy",
+        "_duty_start",
+        "_duty_span",
+        "_duty_heated",
+    )
+
+    def __init__(self):
+        """Initialize."""
+        self._times = array("d", bytes(8 * HISTORY_SIZE))
+        self._temperatures = array("d", bytes(8 * HISTORY_SIZE))
+        self._targets = array("d", bytes(8 * HISTORY_SIZE))
+        self._heating = array("B", bytes(HISTORY_SIZE))
+        # Seconds since the previous sample, the interval ending at a sample.
+        self._spans = array("d", bytes(8 * HISTORY_SIZE))
+        self._end = 0
+        # Regression times are hours since this time, to keep the sums small.
+        self._origin = 0.0
+        self._rate_start = 0
+        self._n = 0
+        self._sum_x = self._sum_y = self._sum_xx = self._sum_xy = 0.0
+        self._duty_start = 0
+        self._duty_span = 0.0
+        self._duty_heated = 0.0
+
+    def __len__(self):
+        """Return the number of samples held."""
+        return min(self._end, HISTORY_SIZE)
+
+    def add(self, now, temperature, target, heating):
+        """Add a sample taken at now (seconds), unless one is too recent."""
+        if temperature is None:
+            return False
+        end = self._end
+        if end and now - self._times[(end - 1) % HISTORY_SIZE] < HISTORY_SPACING:
+            return False
+
+        # The slot about to be reused must leave both windows first.
+        while self._rate_start <= end - HISTORY_SIZE:
+            self._drop_rate_sample()
+        while self._duty_start <= end - HISTORY_SIZE:
+            self._drop_duty_sample()
+
+        slot = end % HISTORY_SIZE
+        self._times[slot] = now
+        self._temperatures[slot] = temperature
+        self._targets[slot] = temperature if target is None else target
+        self._heating[slot] = bool(heating)
+        if end:
+            previous = (end - 1) % HISTORY_SIZE
+            span = now - self._times[previous]
+            self._spans[slot] = span
+            if self._duty_start < end:
+                self._duty_span += span
+                if self._heating[previous]:
+                    self._duty_heated += span
+        else:
+            self._origin = now
+        self._end = end + 1
+        self._add_rate_sample(slot)
+
+        while now - self._times[self._rate_start % HISTORY_SIZE] > RATE_WINDOW:
+            self._drop_rate_sample()
+        while now - self._times[self._duty_start % HISTORY_SIZE] > DUTY_WINDOW:
+            self._drop_duty_sample()
+
+        # Running sums drift as samples come and go, rebuild them now and
+        # then; once per lap of the ring keeps this O(1) per sample.
+        if self._end % HISTORY_SIZE == 0:
+            self._rebuild_rate_sums()
+        return True
+
+    def _x(self, slot):
+        """Return the regression time of a sample."""
+        return (self._times[slot] - self._origin) / _SECONDS_PER_HOUR
+
+    def _add_rate_sample(self, slot):
+        """Add a sample to the regression sums."""
+        x = self._x(slot)
+        y = self._temperatures[slot]
+        self._n += 1
+        self._sum_x += x
+        self._sum_y += y
+        self._sum_xx += x * x
+        self._sum_xy += x * y
+
+    def _drop_rate_sample(self):
+        """Remove the oldest sample of the rate window."""
+        slot = self._rate_start % HISTORY_SIZE
+        x = self._x(slot)
+        y = self._temperatures[slot]
+        self._n -= 1
+        self._sum_x -= x
+        self._sum_y -= y
+        self._sum_xx -= x * x
+        self._sum_xy -= x * y
+        self._rate_start += 1
+
+    def _drop_duty_sample(self):
+        """Remove the oldest sample, and the interval after it, of the duty window."""
+        start = self._duty_start
+        self._duty_start += 1
+        if self._duty_start < self._end:
+            slot = start % HISTORY_SIZE
+            span = self._spans[self._duty_start % HISTORY_SIZE]
+            self._duty_span -= span
+            if self._heating[slot]:
+                self._duty_heated -= span
+
+    def _rebuild_rate_sums(self):
+        """Recompute the regression sums from the window."""
+        self._origin = self._times[self._rate_start % HISTORY_SIZE]
+        self._n = 0
+        self._sum_x = self._sum_y = self._sum_xx = self._sum_xy = 0.0
+        for position in range(self._rate_start, self._end):
+            self._add_rate_sample(position % HISTORY_SIZE)
+
+    @property
+    def rate(self):
+        """Return the temperature trend in degrees per hour, or None."""
+        if self._n < 3:
+            return None
+        first = self._times[self._rate_start % HISTORY_SIZE]
+        last = self._times[(self._end - 1) % HISTORY_SIZE]
+        if last - first < RATE_MIN_SPAN:
+            return None
+        denominator = self._n * self._sum_xx - self._sum_x * self._sum_x
+        if denominator <= 0:
+            return None
+        return (self._n * self._sum_xy - self._sum_x * self._sum_y) / denominator
+
+    @property
+    def duty_cycle(self):
+        """Return the share of the duty window spent heating, in percent."""
+        if self._duty_span <= 0:
+            return None
+        return min(max(self._duty_heated / self._duty_span * 100, 0.0), 100.0)
+
+    @property
+    def time_to_target(self):
+        """Return the minutes until the target is reached at the current rate.
+
+        None if the temperature is not moving towards the target.
+        """
+        if not self._end or (rate := self.rate) is None:
+            return None
+        slot = (self._end - 1) % HISTORY_SIZE
+        gap = self._targets[slot] - self._temperatures[slot]
+        if gap == 0:
+            return 0.0
+        if rate == 0 or (gap > 0) != (rate > 0):
+            return None
+        return gap / rate * 60
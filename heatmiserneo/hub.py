@@ -0,0 +1,819 @@
+"""Heatmiser Neo hub transport."""
+import asyncio
+import collections
+import contextlib
+import hashlib
+import json
+import logging
+import random
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+# Deadlines (seconds) for talking to the hub, matching the old socket timeout.
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 5
+
+# Reconnect backoff bounds (seconds) after the hub refuses a connection.
+RECONNECT_BACKOFF_MIN = 1
+RECONNECT_BACKOFF_MAX = 60
+
+# How many requests may be written to the connection before their replies arrive.
+MAX_IN_FLIGHT = 4
+
+# Bytes asked for per read; INFO from a large hub is tens of kilobytes.
+READ_CHUNK = 65536
+
+# Commands that change values reported by ENGINEERS_DATA.
+ENGINEERS_WRITE_COMMANDS = frozenset({"SET_FROST", "SET_DIFF"})
+
+# Writes are collected for this long (seconds) before being sent as one batch.
+COMMAND_DEBOUNCE = 0.25
+
+# Commands that override each other for the same device.
+COMMAND_FAMILIES = {
+    "FROST_ON": "FROST",
+    "FROST_OFF": "FROST",
+    "TIMER_ON": "TIMER",
+    "TIMER_OFF": "TIMER",
+}
+
+# Fields of GET_LIVE_DATA that tick with the clock rather than with a change.
+LIVE_CLOCK_FIELDS = frozenset({"HUB_TIME", "DATE", "TIME"})
+
+# Commands that only read, and so are safe to send again after a failure.
+READ_COMMANDS = frozenset(
+    {"INFO", "ENGINEERS_DATA", "GET_LIVE_DATA", "READ_COMFORT_LEVELS", "FIRMWARE"}
+)
+
+# Reads are retried up to this many times, waiting a random time of up to
+# RETRY_BACKOFF * 2**attempt seconds, unless RETRY_DEADLINE seconds passed.
+READ_RETRIES = 2
+RETRY_BACKOFF = 0.5
+RETRY_DEADLINE = 6
+
+# After this many failed requests in a row the hub is left alone for
+# CIRCUIT_RESET seconds, doubling up to CIRCUIT_RESET_MAX while it stays dead.
+CIRCUIT_THRESHOLD = 3
+CIRCUIT_RESET = 15
+CIRCUIT_RESET_MAX = 300
+
+# Upper bounds (milliseconds) of the round-trip latency histogram buckets.
+LATENCY_BUCKETS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Weight of the newest sample in the moving latency average.
+LATENCY_SMOOTHING = 0.2
+
+# Returned by a single attempt when the connection dropped before the reply.
+_RESET = object()
+
+
+class HeatmiserNeoError(Exception):
+    """Base class for errors talking to a hub."""
+
+
+class HeatmiserNeoUnavailable(HeatmiserNeoError):
+    """Raised instead of contacting a hub that keeps failing."""
+
+
+class CircuitBreaker:
+    """Stops requests to a hub that failed repeatedly.
+
+    Closed, requests go through. After CIRCUIT_THRESHOLD consecutive failures
+    it opens and requests fail straight away. Once the reset timeout passed
+    requests go through again; a success closes the circuit, a failure opens
+    it again for twice as long.
+    """
+
+    __slots__ = ("failures", "opens", "_open_until", "_reset")
+
+    def __init__(self):
+        """Initialize."""
+        self.failures = 0
+        self.opens = 0
+        self._open_until = None
+        self._reset = CIRCUIT_RESET
+
+    @property
+    def is_open(self):
+        """Return True while requests are refused."""
+        return (
+            self._open_until is not None
+            and asyncio.get_running_loop().time() < self._open_until
+        )
+
+    def record_success(self):
+        """Close the circuit."""
+        self.failures = 0
+        self._open_until = None
+        self._reset = CIRCUIT_RESET
+
+    def record_failure(self):
+        """Count a failure, opening the circuit at the threshold."""
+        self.failures += 1
+        if self.failures < CIRCUIT_THRESHOLD:
+            return
+        if self._open_until is not None:
+            # A trial after the reset timeout failed as well.
+            self._reset = min(self._reset * 2, CIRCUIT_RESET_MAX)
+        self._open_until = asyncio.get_running_loop().time() + self._reset
+        self.opens += 1
+
+
+class NeoFrameBuffer:
+    """Splits the byte stream from a hub into reply frames.
+
+    Replies are terminated by a NUL, some firmware also sends a newline.
+
+    Only bytes received since the last feed are scanned for a terminator and
+    each frame is copied out of the receive buffer once, so a large reply
+    arriving in many chunks costs time linear in its size.
+    """
+
+    __slots__ = ("_buf", "_scanned")
+
+    def __init__(self):
+        """Initialize."""
+        self._buf = bytearray()
+        self._scanned = 0
+
+    def __len__(self):
+        """Return the number of buffered bytes not yet part of a frame."""
+        return len(self._buf)
+
+    def feed(self, data):
+        """Add received bytes and return the frames they completed."""
+        buf = self._buf
+        buf += data
+        frames = []
+        start = 0
+        with memoryview(buf) as view:
+            while (end := self._find_end(self._scanned)) >= 0:
+                # Skip the empty frames between a NUL and a newline.
+                while start < end and buf[start] == 0x0D:
+                    start += 1
+                if start < end:
+                    frames.append(bytes(view[start:end]))
+                start = self._scanned = end + 1
+        if start:
+            del buf[:start]
+        self._scanned = len(buf)
+        return frames
+
+    def _find_end(self, pos):
+        """Return the offset of the next terminator at or after pos, or -1."""
+        nul = self._buf.find(b"\0", pos)
+        newline = self._buf.find(b"\n", pos, nul if nul >= 0 else len(self._buf))
+        return newline if newline >= 0 else nul
+
+    def flush(self):
+        """Return whatever is left once the hub closed the connection."""
+        frame = bytes(self._buf).strip(b"\0\r\n")
+        self._buf.clear()
+        self._scanned = 0
+        return frame or None
+
+
+class _LatencyHistogram:
+    """Round-trip latencies of one command, in fixed buckets."""
+
+    __slots__ = ("buckets", "count", "total", "max", "average")
+
+    def __init__(self):
+        """Initialize."""
+        # One bucket per bound in LATENCY_BUCKETS plus one for slower replies.
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.average = None
+
+    def record(self, latency):
+        """Add a latency in milliseconds."""
+        index = 0
+        while index < len(LATENCY_BUCKETS) and latency > LATENCY_BUCKETS[index]:
+            index += 1
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += latency
+        self.max = max(self.max, latency)
+        if self.average is None:
+            self.average = latency
+        else:
+            self.average += LATENCY_SMOOTHING * (latency - self.average)
+
+    def as_dict(self):
+        """Return the histogram as a JSON serializable dict."""
+        bounds = [f"<={bound}" for bound in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]}"]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 2) if self.count else None,
+            "average_ms": round(self.average, 2) if self.average is not None else None,
+            "max_ms": round(self.max, 2),
+            "buckets_ms": dict(zip(bounds, self.buckets)),
+        }
+
+
+class HeatmiserNeoStats:
+    """Counters describing how the link to a hub behaves.
+
+    Filled in by the connection, the hub and the coordinator; everything is
+    a counter or a running total, so recording a sample is O(1).
+    """
+
+    def __init__(self):
+        """Initialize."""
+        self.latency = collections.defaultdict(_LatencyHistogram)
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.connects = 0
+        self.connect_failures = 0
+        self.timeouts = 0
+        self.retries = 0
+        self.partial_reads = 0
+        self.decodes = 0
+        self.decode_time = 0.0
+        self.decode_errors = 0
+        self.polls = 0
+        self.failed_polls = 0
+        self.last_poll_duration = None
+        self.last_success = None
+        self.poll_time = 0.0
+        self.probes = 0
+        self.unchanged_probes = 0
+        # Filled in when the hub is polled through a shared scheduler.
+        self.poll_phase = None
+        self.poll_shift = None
+        self.scheduled_polls = 0
+        self.throttled = 0
+        self.throttle_time = 0.0
+
+    @property
+    def average_latency(self):
+        """Return the moving average round-trip of INFO in milliseconds."""
+        return self.latency["INFO"].average if "INFO" in self.latency else None
+
+    @property
+    def average_decode_time(self):
+        """Return the mean time spent decoding a reply in milliseconds."""
+        return self.decode_time / self.decodes if self.decodes else None
+
+    @property
+    def average_poll_duration(self):
+        """Return the mean duration of a poll in milliseconds."""
+        return self.poll_time / self.polls if self.polls else None
+
+    @property
+    def average_throttle_time(self):
+        """Return the mean wait of a request held back by the global limit in milliseconds."""
+        return self.throttle_time / self.throttled if self.throttled else None
+
+    def record_poll(self, duration, success):
+        """Add a coordinator poll that took duration milliseconds."""
+        self.polls += 1
+        self.poll_time += duration
+        self.last_poll_duration = duration
+        if success:
+            self.last_success = time.time()
+        else:
+            self.failed_polls += 1
+
+    def as_dict(self):
+        """Return all counters as a JSON serializable dict."""
+        return {
+            "latency": {command: hist.as_dict() for command, hist in self.latency.items()},
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "connects": self.connects,
+            "connect_failures": self.connect_failures,
+            "timeouts": self.timeouts,
+            "retries": self.retries,
+            "partial_reads": self.partial_reads,
+            "decodes": self.decodes,
+            "average_decode_ms": self.average_decode_time,
+            "decode_errors": self.decode_errors,
+            "polls": self.polls,
+            "failed_polls": self.failed_polls,
+            "last_poll_ms": self.last_poll_duration,
+            "last_success": self.last_success,
+            "average_poll_ms": self.average_poll_duration,
+            "probes": self.probes,
+            "unchanged_probes": self.unchanged_probes,
+            "poll_phase": self.poll_phase,
+            "poll_shift": self.poll_shift,
+            "scheduled_polls": self.scheduled_polls,
+            "throttled": self.throttled,
+            "average_throttle_ms": self.average_throttle_time,
+        }
+
+
+class HeatmiserNeoConnection:
+    """Long-lived connection to a Neo hub.
+
+    Requests are written to a single socket as they arrive and the replies
+    are matched back in order, so a poll and a burst of writes share one
+    connection. If the hub drops the connection it is re-opened on the next
+    request, backing off while the hub keeps refusing us.
+
+    limiter, if given, is shared with the connections to other hubs and
+    caps the requests they have in flight together.
+    """
+
+    def __init__(self, host, port, max_in_flight=MAX_IN_FLIGHT, stats=None, limiter=None):
+        """Initialize."""
+        self._host = host
+        self._port = port
+        self._stats = stats if stats is not None else HeatmiserNeoStats()
+        self._limiter = limiter
+        self._reader_task = None
+        self._writer = None
+        self._pending = collections.deque()
+        self._connect_lock = asyncio.Lock()
+        self._serial_lock = asyncio.Lock()
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._pipelining = True
+        self._backoff = 0
+        self._retry_at = 0.0
+        # Set by close(); a closed connection is never opened again.
+        self._closed = False
+
+    @property
+    def connected(self):
+        """Return True if a connection to the hub is open."""
+        return self._writer is not None
+
+    async def request(self, payload):
+        """Send one framed request and return the raw reply, or None."""
+        async with self._in_flight:
+            if self._limiter is None:
+                return await self._send(payload)
+            async with self._limiter.slot(self._stats):
+                return await self._send(payload)
+
+    async def _send(self, payload):
+        """Send a request, once more if the connection was reset under it."""
+        for _ in range(2):
+            if self._closed:
+                return None
+            if self._pipelining:
+                response = await self._request(payload)
+            else:
+                async with self._serial_lock:
+                    response = await self._request(payload)
+            if response is not _RESET:
+                return response
+        return None
+
+    async def close(self):
+        """Close the connection for good and fail anything still waiting on it."""
+        self._closed = True
+        self._drop()
+        if (reader_task := self._reader_task) is not None:
+            self._reader_task = None
+            reader_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await reader_task
+
+    async def _request(self, payload):
+        """Write a request and wait for its reply.
+
+        Returns _RESET if the connection went away before the reply arrived,
+        so the caller can resend on a fresh connection.
+        """
+        try:
+            await self._ensure_connected()
+        except (OSError, asyncio.TimeoutError) as err:
+            _LOGGER.debug("Unable to connect to %s:%s: %s", self._host, self._port, err)
+            return None
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(future)
+        self._writer.write(payload)
+        self._stats.bytes_out += len(payload)
+        try:
+            return await asyncio.wait_for(future, READ_TIMEOUT)
+        except asyncio.TimeoutError:
+            # A late reply would be matched to the wrong request, so start over.
+            self._stats.timeouts += 1
+            self._drop()
+            return None
+        except ConnectionResetError:
+            return _RESET
+
+    async def _ensure_connected(self):
+        """Open the connection if it is not open already."""
+        if self._writer is not None:
+            return
+
+        async with self._connect_lock:
+            if self._writer is not None:
+                return
+            if self._closed:
+                raise ConnectionAbortedError("Connection closed")
+
+            loop = asyncio.get_running_loop()
+            if loop.time() < self._retry_at:
+                raise ConnectionRefusedError("Backing off after failed connect")
+
+            try:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(self._host, self._port), CONNECT_TIMEOUT
+                )
+            except (OSError, asyncio.TimeoutError):
+                if self._closed:
+                    raise
+                self._stats.connect_failures += 1
+                self._backoff = min(
+                    max(self._backoff * 2, RECONNECT_BACKOFF_MIN), RECONNECT_BACKOFF_MAX
+                )
+                self._retry_at = loop.time() + self._backoff
+                raise
+
+            if self._closed:
+                writer.close()
+                raise ConnectionAbortedError("Connection closed while connecting")
+            self._stats.connects += 1
+            self._backoff = 0
+            self._writer = writer
+            # The reader of a dropped connection may still be winding down.
+            if self._reader_task is not None:
+                self._reader_task.cancel()
+            self._reader_task = loop.create_task(self._read_loop(reader, writer))
+
+    async def _read_loop(self, reader, writer):
+        """Hand each reply frame to the oldest waiting request."""
+        frames = NeoFrameBuffer()
+        answered = 0
+        try:
+            while True:
+                chunk = await reader.read(READ_CHUNK)
+                if not chunk:
+                    # Hubs that close after each reply still send a complete frame.
+                    if (frame := frames.flush()) is not None:
+                        self._deliver(frame)
+                        answered += 1
+                    break
+                self._stats.bytes_in += len(chunk)
+                if not (complete := frames.feed(chunk)):
+                    self._stats.partial_reads += 1
+                for frame in complete:
+                    self._deliver(frame)
+                    answered += 1
+        except OSError as err:
+            _LOGGER.debug("Connection to %s:%s lost: %s", self._host, self._port, err)
+        finally:
+            # Only the reader of the current connection speaks for the hub.
+            if self._writer is writer:
+                if answered and self._pending and self._pipelining:
+                    _LOGGER.debug(
+                        "Hub %s:%s closes the connection after each reply, no longer pipelining",
+                        self._host,
+                        self._port,
+                    )
+                    self._pipelining = False
+                self._drop()
+
+    def _deliver(self, frame):
+        """Resolve the oldest waiting request with a reply frame."""
+        while self._pending:
+            future = self._pending.popleft()
+            if not future.done():
+                future.set_result(frame)
+                return
+
+    def _drop(self):
+        """Forget the current connection and fail its waiting requests."""
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.close()
+        while self._pending:
+            future = self._pending.popleft()
+            if not future.done():
+                future.set_exception(ConnectionResetError("Connection to hub lost"))
+
+
+class HeatmiserNeoHub:
+    """Heatmiser Neo Hub API."""
+
+    def __init__(self, host, port, engineers_interval=600, limiter=None):
+        """Initialize."""
+        self._host = host
+        self._port = port
+        self.stats = HeatmiserNeoStats()
+        self.breaker = CircuitBreaker()
+        self._connection = HeatmiserNeoConnection(host, port, stats=self.stats, limiter=limiter)
+        self._engineers_interval = engineers_interval
+        self._engineers_data = None
+        self._engineers_fetched_at = None
+        self._engineers_generation = 0
+        self._engineers_timestamp = None
+        # Whether the hub answers GET_LIVE_DATA, None until it was asked.
+        self.live_supported = None
+        # Bumped whenever GET_LIVE_DATA reports that a profile changed.
+        self.profile_generation = 0
+        self._profile_timestamps = None
+
+    def set_engineers_interval(self, interval):
+        """Change how often (seconds) engineers data is re-read."""
+        self._engineers_interval = interval
+
+    def invalidate_engineers_data(self):
+        """Make the next update re-read engineers data."""
+        self._engineers_fetched_at = None
+        self._engineers_generation += 1
+
+    def _engineers_data_due(self, now):
+        """Return True if the cached engineers data should be refreshed."""
+        return (
+            self._engineers_fetched_at is None
+            or now - self._engineers_fetched_at >= self._engineers_interval
+        )
+
+    async def update(self):
+        """Get the latest data."""
+        now = asyncio.get_running_loop().time()
+        if self._engineers_data_due(now):
+            generation = self._engineers_generation
+            # Both requests share the connection, so they go out back to back.
+            response, eng_response = await asyncio.gather(
+                self.json_request({"INFO": 0}),
+                self.json_request({"ENGINEERS_DATA": 0}),
+            )
+            if eng_response:
+                self._engineers_data = eng_response
+                # A write answered meanwhile may not be reflected in this reply.
+                if generation == self._engineers_generation:
+                    self._engineers_fetched_at = now
+        else:
+            response = await self.json_request({"INFO": 0})
+
+        if not response:
+            return None
+
+        # Return a dictionary keyed by device name for easier access, with
+        # the (possibly cached) engineers data merged into each device.
+        eng_response = self._engineers_data
+        data = {}
+        if response and 'devices' in response:
+            for device in response['devices']:
+                name = device['device']
+                data[name] = device
+                # Add engineers data if available
+                if eng_response and name in eng_response:
+                    data[name]['engineers_data'] = eng_response[name]
+
+        return data
+
+    async def probe(self):
+        """Return a token that changes whenever the state of the hub does.
+
+        The token is built from GET_LIVE_DATA: the hub's change timestamps
+        and the live device values, without the fields that follow the
+        clock. Returns None if the hub did not answer or doesn't support
+        GET_LIVE_DATA, in which case live_supported is set to False.
+        """
+        self.stats.probes += 1
+        response = await self.json_request({"GET_LIVE_DATA": 0})
+        if response is None:
+            return None
+        timestamps = sorted(
+            (key, value)
+            for key, value in (response.items() if isinstance(response, dict) else ())
+            if key.startswith("TIMESTAMP_")
+        )
+        if not timestamps:
+            if self.live_supported is not False:
+                _LOGGER.info("Hub %s doesn't support GET_LIVE_DATA: %s", self._host, response)
+            self.live_supported = False
+            return None
+        self.live_supported = True
+
+        # Engineers data is re-read as soon as the hub reports it changed.
+        engineers_timestamp = response.get("TIMESTAMP_ENGINEERS")
+        if engineers_timestamp != self._engineers_timestamp:
+            if self._engineers_timestamp is not None:
+                self.invalidate_engineers_data()
+            self._engineers_timestamp = engineers_timestamp
+
+        profile_timestamps = [item for item in timestamps if item[0].startswith("TIMESTAMP_PROFILE")]
+        if profile_timestamps != self._profile_timestamps:
+            if self._profile_timestamps is not None:
+                self.profile_generation += 1
+            self._profile_timestamps = profile_timestamps
+
+        devices = [
+            {key: value for key, value in device.items() if key not in LIVE_CLOCK_FIELDS}
+            for device in response.get("devices") or ()
+        ]
+        state = json.dumps([timestamps, devices], sort_keys=True).encode()
+        return hashlib.blake2b(state, digest_size=16).digest()
+
+    async def read_comfort_levels(self, devices):
+        """Return the comfort levels of some zones keyed by name, or None."""
+        response = await self.json_request({"READ_COMFORT_LEVELS": list(devices)})
+        if not isinstance(response, dict) or "error" in response:
+            return None
+        return response
+
+    async def json_request(self, request):
+        """Communicate with the json server.
+
+        Reads are retried with jittered backoff. A reply that can't be
+        decoded, such as one cut short by a dropped connection, counts as no
+        answer. Returns None if the hub did not answer; raises
+        HeatmiserNeoUnavailable without contacting it while the circuit is
+        open.
+        """
+        command = next(iter(request))
+        payload = bytearray(json.dumps(request) + "\0\r", "utf-8")
+        retries = READ_RETRIES if command in READ_COMMANDS else 0
+        deadline = time.perf_counter() + RETRY_DEADLINE
+        for attempt in range(retries + 1):
+            if self.breaker.is_open:
+                raise HeatmiserNeoUnavailable(
+                    f"Hub {self._host} is not responding, {command} not sent"
+                )
+            started = time.perf_counter()
+            response = await self._connection.request(payload)
+            result = None if response is None else self._decode(command, response, started)
+            if result is not None or attempt == retries or time.perf_counter() > deadline:
+                break
+            self.stats.retries += 1
+            await asyncio.sleep(random.uniform(0, RETRY_BACKOFF * 2**attempt))
+
+        if not ENGINEERS_WRITE_COMMANDS.isdisjoint(request):
+            self.invalidate_engineers_data()
+        if result is None:
+            self.breaker.record_failure()
+            return None
+        self.breaker.record_success()
+        return result
+
+    def _decode(self, command, response, started):
+        """Decode a reply to command, or return None if it is not valid JSON."""
+        decode_started = time.perf_counter()
+        try:
+            result = json.loads(response, strict=False)
+        except ValueError as err:
+            self.stats.decode_errors += 1
+            _LOGGER.debug("Undecodable reply from %s to %s: %s", self._host, command, err)
+            return None
+        self.stats.latency[command].record((decode_started - started) * 1000)
+        self.stats.decodes += 1
+        self.stats.decode_time += (time.perf_counter() - decode_started) * 1000
+        return result
+
+    async def close(self):
+        """Close the connection to the hub."""
+        await self._connection.close()
+
+
+class _CommandGroup:
+    """Devices that receive the same command with the same arguments."""
+
+    __slots__ = ("command", "args", "devices")
+
+    def __init__(self, command, args):
+        """Initialize."""
+        self.command = command
+        self.args = args
+        self.devices = {}
+
+    def request(self):
+        """Return the hub request addressing every device in the group."""
+        devices = list(self.devices)
+        target = devices[0] if len(devices) == 1 else devices
+        if self.args is None:
+            return {self.command: target}
+        return {self.command: [self.args, target]}
+
+
+class HeatmiserNeoCommandQueue:
+    """Per-hub queue that coalesces writes into batched commands.
+
+    Writes arriving within a short window are grouped by command and
+    arguments, so twenty zones set to the same temperature become a single
+    SET_TEMP naming all twenty. A later write to a device replaces an
+    earlier one of the same kind that has not been sent yet. Once the batch
+    has been sent, on_flush is awaited once for the whole batch.
+    """
+
+    def __init__(self, hub, delay=COMMAND_DEBOUNCE, on_flush=None):
+        """Initialize."""
+        self._hub = hub
+        self._delay = delay
+        self._on_flush = on_flush
+        self._groups = {}
+        self._targets = {}
+        self._flush_handle = None
+        # Flushes started by the timer, kept so they are not garbage collected.
+        self._flush_tasks = set()
+        self._closed = False
+
+    async def send(self, command, args, device):
+        """Queue a command for a device and return the hub reply."""
+        if self._closed:
+            raise HeatmiserNeoError("Command queue is closed")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._enqueue(command, args, device, future)
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._delay, self._start_flush)
+        return await future
+
+    def _start_flush(self):
+        """Flush the queued batch once the debounce window has passed."""
+        task = asyncio.get_running_loop().create_task(self._flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_done)
+
+    def _flush_done(self, task):
+        """Forget a finished flush, logging what it raised."""
+        self._flush_tasks.discard(task)
+        if not task.cancelled() and (err := task.exception()) is not None:
+            _LOGGER.error("Sending queued commands failed", exc_info=err)
+
+    async def close(self):
+        """Stop sending: drop queued writes, failing their callers, and cancel flushes."""
+        self._closed = True
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._fail(list(self._groups.values()))
+        self._groups = {}
+        self._targets = {}
+        tasks = list(self._flush_tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def send_batch(self, command, args, devices):
+        """Send a command to several devices now, with anything already queued."""
+        if self._closed:
+            raise HeatmiserNeoError("Command queue is closed")
+        future = asyncio.get_running_loop().create_future()
+        for device in devices:
+            self._enqueue(command, args, device, future)
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        await self._flush()
+        return await future
+
+    @staticmethod
+    def _fail(groups):
+        """Fail the callers waiting on groups that will not be sent."""
+        for group in groups:
+            for futures in group.devices.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(HeatmiserNeoError("Command queue is closed"))
+
+    def _enqueue(self, command, args, device, future):
+        """Add a device to the group for a command and its arguments."""
+        key = (command, json.dumps(args, sort_keys=True))
+        target = (COMMAND_FAMILIES.get(command, command), device)
+
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = _CommandGroup(command, args)
+
+        previous = self._targets.get(target)
+        if previous is not None and previous != key:
+            # The newer write wins; its result answers the superseded one too.
+            superseded = self._groups[previous]
+            group.devices[device] = superseded.devices.pop(device)
+            if not superseded.devices:
+                del self._groups[previous]
+        group.devices.setdefault(device, []).append(future)
+        self._targets[target] = key
+
+    async def _flush(self):
+        """Send the queued batch."""
+        groups = list(self._groups.values())
+        self._groups = {}
+        self._targets = {}
+        self._flush_handle = None
+        if not groups:
+            return
+
+        try:
+            results = await asyncio.gather(
+                *(self._hub.json_request(group.request()) for group in groups),
+                return_exceptions=True,
+            )
+        except asyncio.CancelledError:
+            self._fail(groups)
+            raise
+        for group, result in zip(groups, results):
+            for futures in group.devices.values():
+                for future in futures:
+                    if future.done():
+                        continue
+                    if isinstance(result, Exception):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+
+        if self._on_flush is not None:
+            await self._on_flush()
@@ -0,0 +1,118 @@
+"""Heatmiser Neo hubs shared by all config entries."""
+import asyncio
+import logging
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryNotReady
+
+from .const import DOMAIN
+from .coordinator import HeatmiserNeoCoordinator
+from .scheduler import HeatmiserNeoPollScheduler
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_MANAGER = "manager"
+
+
+class _SharedHub:
+    """A coordinator and the config entries using it."""
+
+    def __init__(self, coordinator):
+        """Initialize."""
+        self.coordinator = coordinator
+        # Engineers data interval (minutes) and live mode asked for by each entry.
+        self.holders: dict[str, tuple[int, bool]] = {}
+
+
+class HeatmiserNeoHubManager:
+    """Owns one coordinator, and so one connection and command queue, per hub.
+
+    Hubs are keyed by (host, port) and reference-counted by config entry, so
+    entries pointing at the same physical hub, or an entry reloading while
+    another still uses the hub, never open a second connection or poll it
+    twice. The hub is closed when the last entry releases it.
+
+    All hubs are polled through one scheduler, which staggers their polls
+    and caps the requests they have in flight together.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        """Initialize."""
+        self._hass = hass
+        self.scheduler = HeatmiserNeoPollScheduler()
+        self._hubs: dict[tuple[str, int], _SharedHub] = {}
+        self._locks: dict[tuple[str, int], asyncio.Lock] = {}
+
+    @property
+    def coordinators(self):
+        """Return the coordinator of every hub in use."""
+        return [shared.coordinator for shared in self._hubs.values()]
+
+    async def async_acquire(self, entry_id, host, port, engineers_interval, live_mode=False):
+        """Return the coordinator for a hub, creating it for the first entry.
+
+        Without a stored snapshot, the first refresh is made while holding
+        the lock, so an entry set up concurrently for the same hub waits for
+        it instead of connecting. With one, entities are created from it and
+        the hub is read in the background.
+        """
+        key = (host, port)
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            if (shared := self._hubs.get(key)) is None:
+                shared = _SharedHub(
+                    HeatmiserNeoCoordinator(self._hass, host, port, scheduler=self.scheduler)
+                )
+                self._hubs[key] = shared
+            else:
+                _LOGGER.debug("Sharing hub %s:%s with entries %s", host, port, list(shared.holders))
+
+            shared.holders[entry_id] = (engineers_interval, live_mode)
+            self._apply_options(shared)
+
+            coordinator = shared.coordinator
+            if coordinator.data is None:
+                if await coordinator.async_restore_snapshot():
+                    # Entities start from the snapshot, the hub is read meanwhile.
+                    self._hass.async_create_background_task(
+                        coordinator.async_refresh(), f"{DOMAIN} refresh {host}:{port}"
+                    )
+                    return coordinator
+                await coordinator.async_refresh()
+                if not coordinator.last_update_success:
+                    await self._async_release(key, entry_id)
+                    raise ConfigEntryNotReady(
+                        f"Unable to read Heatmiser Neo hub {host}:{port}"
+                    ) from coordinator.last_exception
+            return coordinator
+
+    async def async_release(self, entry_id, host, port):
+        """Drop an entry's use of a hub, closing the hub if it was the last."""
+        key = (host, port)
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            await self._async_release(key, entry_id)
+
+    async def _async_release(self, key, entry_id):
+        """Release a hub with the lock held."""
+        if (shared := self._hubs.get(key)) is None:
+            return
+        shared.holders.pop(entry_id, None)
+        if shared.holders:
+            self._apply_options(shared)
+            return
+        del self._hubs[key]
+        await shared.coordinator.async_shutdown()
+
+    @staticmethod
+    def _apply_options(shared):
+        """Update the hub as often as the most demanding entry asks."""
+        holders = shared.holders.values()
+        shared.coordinator.set_engineers_interval(min(interval for interval, _ in holders))
+        shared.coordinator.set_live_mode(any(live_mode for _, live_mode in holders))
+
+
+def get_manager(hass: HomeAssistant) -> HeatmiserNeoHubManager:
+    """Return the hub manager, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_MANAGER not in domain_data:
+        domain_data[DATA_MANAGER] = HeatmiserNeoHubManager(hass)
+    return domain_data[DATA_MANAGER]
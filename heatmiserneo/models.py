@@ -0,0 +1,137 @@
+"""Parsed state of the devices attached to a Heatmiser Neo hub."""
+from .const import DEVICE_TYPE_PLUG
+
+
+# Floor temperature reported by thermostats without a floor probe.
+NO_FLOOR_PROBE = 127
+
+
+def _temperature(value):
+    """Return a temperature reported by the hub as a float, or None."""
+    try:
+        return round(float(value), 2)
+    except (TypeError, ValueError):
+        return None
+
+
+def _floor_temperature(value):
+    """Return the floor temperature, or None if no floor probe is fitted."""
+    temperature = _temperature(value)
+    if temperature is None or temperature >= NO_FLOOR_PROBE:
+        return None
+    return temperature
+
+
+class NeoDeviceState:
+    """State of one device, parsed once per poll from INFO and ENGINEERS_DATA.
+
+    Entities read the converted fields instead of parsing the raw reply on
+    every property access. Records are treated as immutable: writes and
+    polls produce a new record via replace().
+    """
+
+    __slots__ = (
+        "name",
+        "device_type",
+        "timeclock",
+        "celsius",
+        "current_temperature",
+        "set_temperature",
+        "humidity",
+        "floor_temperature",
+        "low_battery",
+        "heating",
+        "cooling",
+        "cooling_enabled",
+        "temp_hold",
+        "hold_temperature",
+        "hold_time",
+        "standby",
+        "timer_on",
+        "timer_override",
+        "frost_temperature",
+        "switching_differential",
+        "output_delay",
+    )
+
+    def __init__(self, **fields):
+        """Initialize."""
+        for field in self.__slots__:
+            setattr(self, field, fields.get(field))
+
+    @classmethod
+    def from_info(cls, device, engineers=None):
+        """Build a record from a device in INFO and its engineers data."""
+        engineers = engineers or {}
+        temperature_format = device.get("TEMPERATURE_FORMAT")
+        return cls(
+            name=device["device"],
+            device_type=device.get("DEVICE_TYPE"),
+            timeclock="TIMECLOCK" in (device.get("STAT_MODE") or ()),
+            celsius=not temperature_format or str(temperature_format).upper() == "C",
+            current_temperature=_temperature(device.get("CURRENT_TEMPERATURE")),
+            set_temperature=_temperature(device.get("CURRENT_SET_TEMPERATURE")),
+            humidity=_temperature(device.get("HUMIDITY")),
+            floor_temperature=_floor_temperature(device.get("CURRENT_FLOOR_TEMPERATURE")),
+            low_battery=(
+                bool(device["LOW_BATTERY"]) if device.get("LOW_BATTERY") is not None else None
+            ),
+            heating=bool(device.get("HEATING")),
+            cooling=bool(device.get("COOLING")),
+            cooling_enabled=bool(device.get("COOLING_ENABLED")),
+            temp_hold=bool(device.get("TEMP_HOLD")),
+            hold_temperature=_temperature(device.get("HOLD_TEMPERATURE")),
+            hold_time=device.get("HOLD_TIME"),
+            standby=bool(device.get("STANDBY")),
+            timer_on=bool(device.get("TIMER")),
+            timer_override=bool(device.get("TIME_CLOCK_OVERIDE_BIT")),
+            frost_temperature=_temperature(engineers.get("FROST TEMPERATURE")),
+            switching_differential=_temperature(engineers.get("SWITCHING DIFFERENTIAL")),
+            output_delay=_temperature(engineers.get("OUTPUT DELAY")),
+        )
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a record from the output of as_dict().
+
+        Fields missing from records stored by older versions are None.
+        """
+        return cls(**{field: data.get(field) for field in cls.__slots__})
+
+    def as_dict(self):
+        """Return the fields as a JSON serializable dict."""
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    @property
+    def is_plug(self):
+        """Return True for a NeoPlug rather than a thermostat."""
+        return self.device_type == DEVICE_TYPE_PLUG
+
+    @property
+    def has_timer(self):
+        """Return True if the device switches an output on a timer."""
+        return self.is_plug or self.timeclock
+
+    def replace(self, **changes):
+        """Return a copy of the record with some fields changed."""
+        fields = self.as_dict()
+        fields.update(changes)
+        return NeoDeviceState(**fields)
+
+    def diff(self, other):
+        """Return the names of the fields that differ from another record."""
+        if other is None:
+            return frozenset(self.__slots__)
+        return frozenset(
+            field for field in self.__slots__ if getattr(self, field) != getattr(other, field)
+        )
+
+    def __eq__(self, other):
+        """Return True if both records hold the same values."""
+        if not isinstance(other, NeoDeviceState):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self.__slots__)
+
+    def __repr__(self):
+        """Return a debug representation."""
+        return f"NeoDeviceState({self.name!r})"
@@ -0,0 +1,43 @@
+"""Index of Heatmiser Neo thermostat entities shared by all config entries."""
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+DATA_REGISTRY = "registry"
+
+
+class HeatmiserNeoRegistry:
+    """Looks up thermostat entities by entity_id."""
+
+    def __init__(self):
+        """Initialize."""
+        self._by_entity_id = {}
+
+    def add(self, entity):
+        """Index an entity once it has been added to Home Assistant."""
+        self._by_entity_id[entity.entity_id] = entity
+
+    def remove(self, entity):
+        """Forget an entity that is being removed."""
+        if self._by_entity_id.get(entity.entity_id) is entity:
+            del self._by_entity_id[entity.entity_id]
+
+    def get(self, entity_id):
+        """Return the entity with the given entity_id, or None."""
+        return self._by_entity_id.get(entity_id)
+
+    def resolve(self, entity_ids):
+        """Return the entities for entity_ids and the ids that were not found."""
+        found = []
+        missing = []
+        for entity_id in entity_ids:
+            if (entity := self._by_entity_id.get(entity_id)) is not None:
+                found.append(entity)
+            else:
+                missing.append(entity_id)
+        return found, missing
+
+
+def get_registry(hass: HomeAssistant) -> HeatmiserNeoRegistry:
+    """Return the registry, creating it on first use."""
+    return hass.data.setdefault(DOMAIN, {}).setdefault(DATA_REGISTRY, HeatmiserNeoRegistry())
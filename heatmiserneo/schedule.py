@@ -0,0 +1,89 @@
+"""Comfort level schedules of Heatmiser Neo zones."""
+from bisect import bisect_right
+from datetime import timedelta
+
+DAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+_MINUTES_PER_DAY = 24 * 60
+_MINUTES_PER_WEEK = 7 * _MINUTES_PER_DAY
+
+
+def _day_levels(levels, day):
+    """Return the comfort levels of a weekday in a READ_COMFORT_LEVELS reply.
+
+    Zones in 7 day mode list every day, 5/2 day mode lists weekdays and the
+    weekend, 24 hour mode a single day that applies to all of them.
+    """
+    for key in (DAYS[day], "weekday" if day < 5 else "weekend", "mon-fri" if day < 5 else "sat-sun"):
+        if key in levels:
+            return levels[key]
+    if len(levels) == 1:
+        return next(iter(levels.values()))
+    return None
+
+
+class NeoSchedule:
+    """Weekly comfort level schedule of one zone.
+
+    Stored as the minutes of the week at which the setpoint changes and the
+    setpoint from then on, so the next change is found with a bisect.
+    """
+
+    __slots__ = ("_minutes", "_setpoints")
+
+    def __init__(self, changes):
+        """Initialize from (minute of week, setpoint) pairs."""
+        changes = sorted(changes)
+        # Levels that keep the setpoint of the level before are not changes.
+        kept = [
+            (minute, setpoint)
+            for index, (minute, setpoint) in enumerate(changes)
+            if setpoint != changes[index - 1][1]
+        ]
+        if changes and not kept:
+            kept = changes[:1]
+        self._minutes = [minute for minute, _ in kept]
+        self._setpoints = [setpoint for _, setpoint in kept]
+
+    @classmethod
+    def from_comfort_levels(cls, levels):
+        """Build a schedule from a zone's entry in READ_COMFORT_LEVELS."""
+        changes = []
+        for day in range(7):
+            for level in (_day_levels(levels, day) or {}).values():
+                if not isinstance(level, (list, tuple)) or len(level) < 2:
+                    continue
+                try:
+                    hours, minutes = (int(part) for part in str(level[0]).split(":"))
+                    setpoint = float(level[1])
+                except ValueError:
+                    continue
+                # Unused levels are set to 24:00.
+                if hours < 24:
+                    changes.append((day * _MINUTES_PER_DAY + hours * 60 + minutes, setpoint))
+        return cls(changes)
+
+    def __bool__(self):
+        """Return True if the schedule has any change."""
+        return bool(self._minutes)
+
+    def __eq__(self, other):
+        """Return True if both schedules change at the same times to the same setpoints."""
+        if not isinstance(other, NeoSchedule):
+            return NotImplemented
+        return self._minutes == other._minutes and self._setpoints == other._setpoints
+
+    def next_change(self, now):
+        """Return (time, setpoint) of the first change after now, or None.
+
+        now is an aware datetime in the hub's (Home Assistant's) time zone.
+        """
+        if not self._minutes:
+            return None
+        minute = now.weekday() * _MINUTES_PER_DAY + now.hour * 60 + now.minute
+        index = bisect_right(self._minutes, minute)
+        if index == len(self._minutes):
+            index = 0
+        delta = (self._minutes[index] - minute) % _MINUTES_PER_WEEK or _MINUTES_PER_WEEK
+        start = now.replace(second=0, microsecond=0)
+        return start + timedelta(minutes=delta), self._setpoints[index]
@@ -0,0 +1,107 @@
+"""Polling schedule shared by all Heatmiser Neo hubs."""
+import asyncio
+import contextlib
+import itertools
+import time
+
+# Requests in flight at once across all hubs, twice what one hub may pipeline.
+GLOBAL_MAX_IN_FLIGHT = 8
+
+
+def _phase(slot):
+    """Return the share of the interval at which the hub in a slot polls.
+
+    Slots 0, 1, 2, 3, 4... get 0, 1/2, 1/4, 3/4, 1/8... (the base 2 van der
+    Corput sequence), so hubs stay evenly spread however many are added and
+    adding one never moves the others.
+    """
+    phase, denominator = 0.0, 1
+    while slot:
+        denominator *= 2
+        slot, bit = divmod(slot, 2)
+        phase += bit / denominator
+    return phase
+
+
+class RequestLimiter:
+    """Caps the requests in flight across the connections to all hubs."""
+
+    def __init__(self, limit=GLOBAL_MAX_IN_FLIGHT):
+        """Initialize."""
+        self.limit = limit
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    @contextlib.asynccontextmanager
+    async def slot(self, stats):
+        """Hold one of the request slots, counting the wait against a hub's stats."""
+        if self._semaphore.locked():
+            started = time.perf_counter()
+            await self._semaphore.acquire()
+            stats.throttled += 1
+            stats.throttle_time += (time.perf_counter() - started) * 1000
+        else:
+            await self._semaphore.acquire()
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+
+class HeatmiserNeoPollScheduler:
+    """Spreads the polls of all hubs over their interval and caps their requests.
+
+    Every hub gets a phase, a fixed share of the polling interval. A poll due
+    after some interval is moved to the nearest time that sits at the hub's
+    phase on a grid of that interval, so hubs polling at the same interval
+    never fire together however their polls drifted, and the requests they
+    still make at once are capped by a limiter shared by all connections.
+    """
+
+    def __init__(self, max_in_flight=GLOBAL_MAX_IN_FLIGHT):
+        """Initialize."""
+        self.limiter = RequestLimiter(max_in_flight)
+        self._slots = {}
+        self._stats = {}
+
+    def register(self, key, stats):
+        """Give a hub the first free slot; stats receives its scheduling counters."""
+        used = set(self._slots.values())
+        slot = next(slot for slot in itertools.count() if slot not in used)
+        self._slots[key] = slot
+        self._stats[key] = stats
+        stats.poll_phase = _phase(slot)
+
+    def unregister(self, key):
+        """Free the slot of a hub that is no longer polled."""
+        self._slots.pop(key, None)
+        self._stats.pop(key, None)
+
+    def next_interval(self, key, interval, now):
+        """Return the seconds until the next poll of a hub due in interval seconds.
+
+        The result lies between half and one and a half intervals, so a hub
+        never polls faster than twice its normal rate while it is aligned.
+        """
+        if key not in self._slots or interval <= 0:
+            return interval
+        offset = _phase(self._slots[key]) * interval
+        due = now + interval
+        delay = round((due - offset) / interval) * interval + offset - now
+        stats = self._stats[key]
+        stats.scheduled_polls += 1
+        stats.poll_shift = delay - interval
+        return delay
+
+    def as_dict(self):
+        """Return the state of the limiter as a JSON serializable dict."""
+        return {
+            "hubs": len(self._slots),
+            "max_in_flight": self.limiter.limit,
+            "in_flight": self.limiter.in_flight,
+            "peak_in_flight": self.limiter.peak_in_flight,
+        }
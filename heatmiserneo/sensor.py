@@ -6,11 +6,30 @@ Heatmiser NeoStat Sensors
 """
 
 import logging
-from homeassistant.components.sensor import SensorEntity
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
 from homeassistant.components.binary_sensor import BinarySensorEntity
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.const import (
+    PERCENTAGE,
+    EntityCategory,
+    UnitOfInformation,
+    UnitOfTemperature,
+    UnitOfTime,
+)
+from homeassistant.core import callback
+from homeassistant.util import dt as dt_util
 from .const import DOMAIN
+from .entity import HeatmiserNeoEntity, hub_device_info
+from .history import NeoDeviceHistory
+from .hub import HeatmiserNeoStats
+from .models import NeoDeviceState
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -22,302 +41,396 @@ async def async_setup_entry(hass, entry, async_add_entities):
 
     if coordinator.data:
         for name, device in coordinator.data.items():
-            if device['DEVICE_TYPE'] != 6:
+            if not device.is_plug:
                 sensors.append(HeatmiserNeoHoldSensor(coordinator, name))
-                sensors.append(HeatmiserNeoHoldTimeSensor(coordinator, name))
-                sensors.append(HeatmiserNeoTemperatureSensor(coordinator, name))
-                sensors.append(HeatmiserNeoTargetTemperatureSensor(coordinator, name))
-                sensors.append(HeatmiserNeoSwitchingDifferentialSensor(coordinator, name))
-                sensors.append(HeatmiserNeoOutputDelaySensor(coordinator, name))
+                sensors.extend(
+                    HeatmiserNeoSensor(coordinator, name, description)
+                    for description in DEVICE_SENSORS
+                    if description.exists_fn(device)
+                )
+                sensors.extend(
+                    HeatmiserNeoTrendSensor(coordinator, name, description)
+                    for description in TREND_SENSORS
+                )
+            if device.has_timer:
+                sensors.extend(
+                    HeatmiserNeoSensor(coordinator, name, description)
+                    for description in TIMER_SENSORS
+                )
+
+    sensors.extend(
+        HeatmiserNeoHubSensor(coordinator, description) for description in HUB_SENSORS
+    )
+
+    async_add_entities(sensors)
+
+
+def _round(value, digits=1):
+    """Round a value that may be None."""
+    return None if value is None else round(value, digits)
+
+
+@dataclass(frozen=True, kw_only=True)
+class HeatmiserNeoSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor showing one value of a thermostat.
+
+    The key is also the unique_id suffix, fields are the record fields the
+    value is read from, and exists_fn decides from the first poll whether
+    a device gets the sensor at all.
+    """
+
+    value_fn: Callable[[NeoDeviceState], float | str | None]
+    fields: frozenset[str]
+    exists_fn: Callable[[NeoDeviceState], bool] = lambda device: True
+
+
+DEVICE_SENSORS = (
+    HeatmiserNeoSensorEntityDescription(
+        key="hold-time",
+        name="Hold Time",
+        icon="mdi:clock-outline",
+        fields=frozenset({"temp_hold", "hold_time"}),
+        value_fn=lambda device: device.hold_time if device.temp_hold else "00:00",
+    ),
+    HeatmiserNeoSensorEntityDescription(
+        key="current-temperature",
+        name="Current Temperature",
+        icon="mdi:thermometer",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        fields=frozenset({"current_temperature"}),
+        value_fn=lambda device: device.current_temperature,
+    ),
+    HeatmiserNeoSensorEntityDescription(
+        key="target-temperature",
+        name="Target Temperature",
+        icon="mdi:thermometer-check",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        fields=frozenset({"set_temperature"}),
+        value_fn=lambda device: device.set_temperature,
+    ),
+    HeatmiserNeoSensorEntityDescription(
+        key="switching-differential",
+        name="Switching Differential",
+        icon="mdi:thermometer-lines",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        fields=frozenset({"switching_differential"}),
+        value_fn=lambda device: device.switching_differential,
+    ),
+    HeatmiserNeoSensorEntityDescription(
+        key="output-delay",
+        name="Output Delay",
+        icon="mdi:timer-sand",
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        fields=frozenset({"output_delay"}),
+        value_fn=lambda device: device.output_delay,
+    ),
+    HeatmiserNeoSensorEntityDescription(
+        key="humidity",
+        name="Humidity",
+        device_class=SensorDeviceClass.HUMIDITY,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=PERCENTAGE,
+        fields=frozenset({"humidity"}),
+        value_fn=lambda device: device.humidity,
+        # Thermostats without a humidity sensor report 0.
+        exists_fn=lambda device: bool(device.humidity),
+    ),
+    HeatmiserNeoSensorEntityDescription(
+        key="floor-temperature",
+        name="Floor Temperature",
+        icon="mdi:heating-coil",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        fields=frozenset({"floor_temperature"}),
+        value_fn=lambda device: device.floor_temperature,
+        exists_fn=lambda device: device.floor_temperature is not None,
+    ),
+    HeatmiserNeoSensorEntityDescription(
+        key="battery",
+        name="Battery",
+        device_class=SensorDeviceClass.ENUM,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        options=["ok", "low"],
+        fields=frozenset({"low_battery"}),
+        value_fn=lambda device: None if device.low_battery is None else (
+            "low" if device.low_battery else "ok"
+        ),
+        exists_fn=lambda device: device.low_battery is not None,
+    ),
+)
+
+
+# Sensors of NeoPlugs and of NeoStats in timeclock mode.
+TIMER_SENSORS = (
+    HeatmiserNeoSensorEntityDescription(
+        key="output",
+        name="Output",
+        icon="mdi:power-plug",
+        device_class=SensorDeviceClass.ENUM,
+        options=["on", "off"],
+        fields=frozenset({"timer_on"}),
+        value_fn=lambda device: None if device.timer_on is None else (
+            "on" if device.timer_on else "off"
+        ),
+    ),
+    HeatmiserNeoSensorEntityDescription(
+        key="timer-mode",
+        name="Timer Mode",
+        icon="mdi:timer-cog-outline",
+        device_class=SensorDeviceClass.ENUM,
+        options=["auto", "override"],
+        fields=frozenset({"timer_override"}),
+        value_fn=lambda device: None if device.timer_override is None else (
+            "override" if device.timer_override else "auto"
+        ),
+    ),
+)
+
+
+class HeatmiserNeoSensor(HeatmiserNeoEntity, SensorEntity):
+    """Represents one value of a Heatmiser NeoStat, as described by its description."""
+
+    entity_description: HeatmiserNeoSensorEntityDescription
+
+    def __init__(self, coordinator, name, description):
+        super().__init__(coordinator, name)
+        self.entity_description = description
+        self._neo_fields = description.fields
+        self._attr_unique_id = f"{coordinator.host}-{name}-{description.key}"
+        self._attr_name = f"{name} {description.name}"
+
+    @property
+    def native_value(self):
+        """Return the state of the sensor."""
+        if self.data:
+            return self.entity_description.value_fn(self.data)
+        return None
 
-    async_add_entities(sensors, True)
 
-class HeatmiserNeoHoldSensor(CoordinatorEntity, BinarySensorEntity):
+class HeatmiserNeoHoldSensor(HeatmiserNeoEntity, BinarySensorEntity):
     """Represents a Heatmiser NeoStat Hold Sensor."""
 
-    def __init__(self, coordinator, name):
-        super().__init__(coordinator)
-        self._name = name
-        self._coordinator = coordinator
-
-    @property
-    def data(self):
-        """Helper to get data for this device."""
-        return self.coordinator.data.get(self._name)
+    _neo_fields = frozenset({"temp_hold"})
+    _attr_icon = "mdi:car-brake-hold"
 
-    @property
-    def unique_id(self):
-        """Return a unique ID."""
-        return f"{self.coordinator.host}-{self._name}-hold-status"
-
-    @property
-    def name(self):
-        """Return the name of the sensor."""
-        return f"{self._name} Hold Status"
-
-    @property
-    def device_info(self):
-        """Return device information."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, f"{self.coordinator.host}-{self._name}")},
-            name=self._name,
-            manufacturer="Heatmiser",
-            model="NeoStat",
-            via_device=(DOMAIN, self.coordinator.host),
-        )
+    def __init__(self, coordinator, name):
+        super().__init__(coordinator, name)
+        self._attr_unique_id = f"{coordinator.host}-{name}-hold-status"
+        self._attr_name = f"{name} Hold Status"
 
     @property
     def is_on(self):
         """Return true if the thermostat is on hold."""
         if self.data:
-            return self.data.get("TEMP_HOLD")
+            return self.data.temp_hold
         return False
 
-    @property
-    def icon(self):
-        """Return the icon to use in the frontend."""
-        return "mdi:car-brake-hold"
 
-class HeatmiserNeoHoldTimeSensor(CoordinatorEntity, SensorEntity):
-    """Represents a Heatmiser NeoStat Hold Time Sensor."""
+@dataclass(frozen=True, kw_only=True)
+class HeatmiserNeoTrendSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor derived from the recent history of a thermostat."""
 
-    def __init__(self, coordinator, name):
-        super().__init__(coordinator)
-        self._name = name
-        self._coordinator = coordinator
-
-    @property
-    def data(self):
-        """Helper to get data for this device."""
-        return self.coordinator.data.get(self._name)
+    value_fn: Callable[[NeoDeviceHistory], float | None]
 
-    @property
-    def unique_id(self):
-        """Return a unique ID."""
-        return f"{self.coordinator.host}-{self._name}-hold-time"
 
-    @property
-    def name(self):
-        """Return the name of the sensor."""
-        return f"{self._name} Hold Time"
+TREND_SENSORS = (
+    HeatmiserNeoTrendSensorEntityDescription(
+        key="temperature-rate",
+        name="Temperature Rate",
+        icon="mdi:thermometer-chevron-up",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement="°C/h",
+        value_fn=lambda history: _round(history.rate, 2),
+    ),
+    HeatmiserNeoTrendSensorEntityDescription(
+        key="time-to-target",
+        name="Time to Target",
+        icon="mdi:timer-outline",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        value_fn=lambda history: _round(history.time_to_target, 0),
+    ),
+    HeatmiserNeoTrendSensorEntityDescription(
+        key="heating-duty-cycle",
+        name="Heating Duty Cycle",
+        icon="mdi:radiator",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=PERCENTAGE,
+        value_fn=lambda history: _round(history.duty_cycle),
+    ),
+)
 
-    @property
-    def device_info(self):
-        """Return device information."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, f"{self.coordinator.host}-{self._name}")},
-            name=self._name,
-            manufacturer="Heatmiser",
-            model="NeoStat",
-            via_device=(DOMAIN, self.coordinator.host),
-        )
 
-    @property
-    def state(self):
-        """Return the state of the sensor."""
-        if self.data:
-            if self.data.get("TEMP_HOLD"):
-                return self.data.get("HOLD_TIME")
-            else:
-                return "00:00"
-        return None
-    
-    @property
-    def icon(self):
-        return "mdi:clock-outline"
+class HeatmiserNeoTrendSensor(HeatmiserNeoEntity, SensorEntity):
+    """Represents a value derived from the recent history of a thermostat.
 
-class HeatmiserNeoTemperatureSensor(CoordinatorEntity, SensorEntity):
-    """Represents a Heatmiser NeoStat Current Temperature Sensor."""
+    Trends move even when no reading does, so these are polled like the
+    hub sensors rather than written on coordinator updates.
+    """
 
-    def __init__(self, coordinator, name):
-        super().__init__(coordinator)
-        self._name = name
-        self._coordinator = coordinator
+    entity_description: HeatmiserNeoTrendSensorEntityDescription
 
-    @property
-    def data(self):
-        """Helper to get data for this device."""
-        return self.coordinator.data.get(self._name)
+    def __init__(self, coordinator, name, description):
+        super().__init__(coordinator, name)
+        self.entity_description = description
+        self._attr_unique_id = f"{coordinator.host}-{name}-{description.key}"
+        self._attr_name = f"{name} {description.name}"
 
     @property
-    def unique_id(self):
-        """Return a unique ID."""
-        return f"{self.coordinator.host}-{self._name}-current-temperature"
+    def should_poll(self):
+        """Read the history on the platform scan interval."""
+        return True
 
-    @property
-    def name(self):
-        """Return the name of the sensor."""
-        return f"{self._name} Current Temperature"
+    async def async_update(self):
+        """Nothing to fetch, the coordinator keeps the history."""
 
-    @property
-    def device_info(self):
-        """Return device information."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, f"{self.coordinator.host}-{self._name}")},
-            name=self._name,
-            manufacturer="Heatmiser",
-            model="NeoStat",
-            via_device=(DOMAIN, self.coordinator.host),
-        )
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Leave state writes to polling."""
 
     @property
-    def state(self):
+    def native_value(self):
         """Return the state of the sensor."""
-        if self.data:
-            return round(float(self.data.get("CURRENT_TEMPERATURE")), 2)
-        return None
-    
-    @property
-    def unit_of_measurement(self):
-        return "°C"
-        
-    @property
-    def icon(self):
-        return "mdi:thermometer"
-
-class HeatmiserNeoTargetTemperatureSensor(CoordinatorEntity, SensorEntity):
-    """Represents a Heatmiser NeoStat Target Temperature Sensor."""
-
-    def __init__(self, coordinator, name):
-        super().__init__(coordinator)
-        self._name = name
-        self._coordinator = coordinator
-
-    @property
-    def data(self):
-        """Helper to get data for this device."""
-        return self.coordinator.data.get(self._name)
-
-    @property
-    def unique_id(self):
-        """Return a unique ID."""
-        return f"{self.coordinator.host}-{self._name}-target-temperature"
-
-    @property
-    def name(self):
-        """Return the name of the sensor."""
-        return f"{self._name} Target Temperature"
-
-    @property
-    def device_info(self):
-        """Return device information."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, f"{self.coordinator.host}-{self._name}")},
-            name=self._name,
-            manufacturer="Heatmiser",
-            model="NeoStat",
-            via_device=(DOMAIN, self.coordinator.host),
-        )
-
-    @property
-    def state(self):
-        """Return the state of the sensor."""
-        if self.data:
-            return round(float(self.data.get("CURRENT_SET_TEMPERATURE")), 2)
-        return None
-    
-    @property
-    def unit_of_measurement(self):
-        return "°C"
-        
-    @property
-    def icon(self):
-        return "mdi:thermometer-check"
-
-class HeatmiserNeoSwitchingDifferentialSensor(CoordinatorEntity, SensorEntity):
-    """Represents a Heatmiser NeoStat Switching Differential Sensor."""
-
-    def __init__(self, coordinator, name):
-        super().__init__(coordinator)
-        self._name = name
-        self._coordinator = coordinator
-
-    @property
-    def data(self):
-        """Helper to get data for this device."""
-        return self.coordinator.data.get(self._name)
-
-    @property
-    def unique_id(self):
-        """Return a unique ID."""
-        return f"{self.coordinator.host}-{self._name}-switching-differential"
-
-    @property
-    def name(self):
-        """Return the name of the sensor."""
-        return f"{self._name} Switching Differential"
-
-    @property
-    def device_info(self):
-        """Return device information."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, f"{self.coordinator.host}-{self._name}")},
-            name=self._name,
-            manufacturer="Heatmiser",
-            model="NeoStat",
-            via_device=(DOMAIN, self.coordinator.host),
-        )
-
-    @property
-    def state(self):
+        if (history := self.coordinator.history.get(self._name)) is None:
+            return None
+        return self.entity_description.value_fn(history)
+
+
+@dataclass(frozen=True, kw_only=True)
+class HeatmiserNeoHubSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor reading the link statistics of a hub."""
+
+    value_fn: Callable[[HeatmiserNeoStats], float | int | None]
+
+
+HUB_SENSORS = (
+    HeatmiserNeoHubSensorEntityDescription(
+        key="latency",
+        name="Round-trip latency",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        value_fn=lambda stats: _round(stats.average_latency),
+    ),
+    HeatmiserNeoHubSensorEntityDescription(
+        key="poll_duration",
+        name="Poll duration",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        value_fn=lambda stats: _round(stats.last_poll_duration),
+    ),
+    HeatmiserNeoHubSensorEntityDescription(
+        key="json_decode_time",
+        name="JSON decode time",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        entity_registry_enabled_default=False,
+        value_fn=lambda stats: _round(stats.average_decode_time, 2),
+    ),
+    HeatmiserNeoHubSensorEntityDescription(
+        key="connect_failures",
+        name="Connect failures",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda stats: stats.connect_failures,
+    ),
+    HeatmiserNeoHubSensorEntityDescription(
+        key="timeouts",
+        name="Timeouts",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda stats: stats.timeouts,
+    ),
+    HeatmiserNeoHubSensorEntityDescription(
+        key="last_success",
+        name="Last successful poll",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda stats: (
+            dt_util.utc_from_timestamp(stats.last_success) if stats.last_success else None
+        ),
+    ),
+    HeatmiserNeoHubSensorEntityDescription(
+        key="retries",
+        name="Retries",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=False,
+        value_fn=lambda stats: stats.retries,
+    ),
+    HeatmiserNeoHubSensorEntityDescription(
+        key="partial_reads",
+        name="Partial frame reads",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=False,
+        value_fn=lambda stats: stats.partial_reads,
+    ),
+    HeatmiserNeoHubSensorEntityDescription(
+        key="throttled",
+        name="Throttled requests",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=False,
+        value_fn=lambda stats: stats.throttled,
+    ),
+    HeatmiserNeoHubSensorEntityDescription(
+        key="throttle_wait",
+        name="Throttle wait",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        entity_registry_enabled_default=False,
+        value_fn=lambda stats: _round(stats.average_throttle_time),
+    ),
+    HeatmiserNeoHubSensorEntityDescription(
+        key="poll_shift",
+        name="Poll shift",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        entity_registry_enabled_default=False,
+        value_fn=lambda stats: _round(stats.poll_shift),
+    ),
+    HeatmiserNeoHubSensorEntityDescription(
+        key="bytes_in",
+        name="Bytes received",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        entity_registry_enabled_default=False,
+        value_fn=lambda stats: stats.bytes_in,
+    ),
+    HeatmiserNeoHubSensorEntityDescription(
+        key="bytes_out",
+        name="Bytes sent",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        entity_registry_enabled_default=False,
+        value_fn=lambda stats: stats.bytes_out,
+    ),
+)
+
+
+class HeatmiserNeoHubSensor(SensorEntity):
+    """Diagnostic sensor for the link to a hub.
+
+    Counters change with every request, not only when device data does,
+    so these entities are polled instead of following the coordinator.
+    They stay available while the hub is down so failures can be seen.
+    """
+
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, coordinator, description):
+        self.coordinator = coordinator
+        self.entity_description = description
+        self._attr_unique_id = f"{coordinator.host}-hub-{description.key}"
+        self._attr_device_info = hub_device_info(coordinator)
+
+    @property
+    def native_value(self):
         """Return the state of the sensor."""
-        if self.data and 'engineers_data' in self.data:
-            return round(float(self.data['engineers_data'].get("SWITCHING DIFFERENTIAL")), 2)
-        return None
-    
-    @property
-    def unit_of_measurement(self):
-        return "°C"
-        
-    @property
-    def icon(self):
-        return "mdi:thermometer-lines"
-
-class HeatmiserNeoOutputDelaySensor(CoordinatorEntity, SensorEntity):
-    """Represents a Heatmiser NeoStat Output Delay Sensor."""
-
-    def __init__(self, coordinator, name):
-        super().__init__(coordinator)
-        self._name = name
-        self._coordinator = coordinator
-
-    @property
-    def data(self):
-        """Helper to get data for this device."""
-        return self.coordinator.data.get(self._name)
-
-    @property
-    def unique_id(self):
-        """Return a unique ID."""
-        return f"{self.coordinator.host}-{self._name}-output-delay"
-
-    @property
-    def name(self):
-        """Return the name of the sensor."""
-        return f"{self._name} Output Delay"
-
-    @property
-    def device_info(self):
-        """Return device information."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, f"{self.coordinator.host}-{self._name}")},
-            name=self._name,
-            manufacturer="Heatmiser",
-            model="NeoStat",
-            via_device=(DOMAIN, self.coordinator.host),
-        )
-
-    @property
-    def state(self):
-        """Return the state of the sensor."""
-        if self.data and 'engineers_data' in self.data:
-            return round(float(self.data['engineers_data'].get("OUTPUT DELAY")), 2)
-        return None
-    
-    @property
-    def unit_of_measurement(self):
-        return "min"
-        
-    @property
-    def icon(self):
-        return "mdi:timer-sand"
+        return self.entity_description.value_fn(self.coordinator.hub.stats)
@@ -2,14 +2,13 @@
 homeassistant.components.switch.heatmiserneo
 ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
-Heatmiser NeoStat Standby Switch
+Heatmiser NeoStat Standby and NeoPlug / timeclock output switches
 """
 
 import logging
 from homeassistant.components.switch import SwitchEntity
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from homeassistant.helpers.entity import DeviceInfo
 from .const import DOMAIN
+from .entity import HeatmiserNeoEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -21,67 +20,66 @@ async def async_setup_entry(hass, entry, async_add_entities):
 
     if coordinator.data:
         for name, device in coordinator.data.items():
-            if device['DEVICE_TYPE'] != 6:
+            if not device.is_plug:
                 switches.append(HeatmiserNeoStandbySwitch(coordinator, name))
+            if device.has_timer:
+                switches.append(HeatmiserNeoTimerSwitch(coordinator, name))
 
-    async_add_entities(switches, True)
+    async_add_entities(switches)
 
-class HeatmiserNeoStandbySwitch(CoordinatorEntity, SwitchEntity):
+class HeatmiserNeoStandbySwitch(HeatmiserNeoEntity, SwitchEntity):
     """Represents a Heatmiser NeoStat Standby Switch."""
 
+    _neo_fields = frozenset({"standby"})
+    _attr_icon = "mdi:snowflake"
+
     def __init__(self, coordinator, name):
-        super().__init__(coordinator)
-        self._name = name
-        self._coordinator = coordinator
+        super().__init__(coordinator, name)
+        self._attr_unique_id = f"{coordinator.host}-{name}-standby"
+        self._attr_name = f"{name} Standby"
 
     @property
-    def data(self):
-        """Helper to get data for this device."""
-        return self.coordinator.data.get(self._name)
+    def is_on(self):
+        """Return true if the switch is on (Standby Active)."""
+        if self.data:
+            return self.data.standby
+        return False
 
-    @property
-    def unique_id(self):
-        """Return a unique ID."""
-        return f"{self.coordinator.host}-{self._name}-standby"
+    async def async_turn_on(self, **kwargs):
+        """Turn the switch on (Activate Standby)."""
+        await self.coordinator.async_send_command("FROST_ON", None, str(self._name))
 
-    @property
-    def name(self):
-        """Return the name of the switch."""
-        return f"{self._name} Standby"
+    async def async_turn_off(self, **kwargs):
+        """Turn the switch off (Deactivate Standby)."""
+        await self.coordinator.async_send_command("FROST_OFF", None, str(self._name))
 
-    @property
-    def device_info(self):
-        """Return device information."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, f"{self.coordinator.host}-{self._name}")},
-            name=self._name,
-            manufacturer="Heatmiser",
-            model="NeoStat",
-            via_device=(DOMAIN, self.coordinator.host),
-        )
+
+class HeatmiserNeoTimerSwitch(HeatmiserNeoEntity, SwitchEntity):
+    """Represents the output of a NeoPlug or a NeoStat in timeclock mode.
+
+    Switching several outputs at once (a scene, a group) is sent to the hub
+    as one TIMER_ON or TIMER_OFF for all of them by the command queue.
+    """
+
+    _neo_fields = frozenset({"timer_on"})
+    _attr_icon = "mdi:power-socket-uk"
+
+    def __init__(self, coordinator, name):
+        super().__init__(coordinator, name)
+        self._attr_unique_id = f"{coordinator.host}-{name}-timer"
+        self._attr_name = f"{name} Output"
 
     @property
     def is_on(self):
-        """Return true if the switch is on (Standby Active)."""
+        """Return true if the output is on."""
         if self.data:
-            return self.data.get("STANDBY")
+            return self.data.timer_on
         return False
 
-    @property
-    def icon(self):
-        """Return the icon to use in the frontend."""
-        return "mdi:snowflake"
-
     async def async_turn_on(self, **kwargs):
-        """Turn the switch on (Activate Standby)."""
-        await self.hass.async_add_executor_job(
-            lambda: self.coordinator.hub.json_request({"FROST_ON": str(self._name)})
-        )
-        await self.coordinator.async_request_refresh()
+        """Turn the output on."""
+        await self.coordinator.async_send_command("TIMER_ON", None, str(self._name))
 
     async def async_turn_off(self, **kwargs):
-        """Turn the switch off (Deactivate Standby)."""
-        await self.hass.async_add_executor_job(
-            lambda: self.coordinator.hub.json_request({"FROST_OFF": str(self._name)})
-        )
-        await self.coordinator.async_request_refresh()
+        """Turn the output off."""
+        await self.coordinator.async_send_command("TIMER_OFF", None, str(self._name))
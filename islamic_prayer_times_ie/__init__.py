@@ -5,9 +5,10 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.storage import Store
 
 from .const import DOMAIN
-from .coordinator import IslamicPrayerDataUpdateCoordinator
+from .coordinator import STORAGE_KEY, STORAGE_VERSION, IslamicPrayerDataUpdateCoordinator
 
 PLATFORMS = [Platform.SENSOR]
 
@@ -45,3 +46,8 @@ async def async_options_updated(hass: HomeAssistant, entry: ConfigEntry) -> None
     if coordinator.event_unsub:
         coordinator.event_unsub()
     await coordinator.async_request_refresh()
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored prayer timetable with the entry."""
+    await Store(hass, STORAGE_VERSION, STORAGE_KEY).async_remove()
@@ -12,13 +12,20 @@ from requests.exceptions import ConnectionError as ConnError
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.event import async_call_later, async_track_point_in_time
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 import homeassistant.util.dt as dt_util
 
 from .const import CONF_CALC_METHOD, DEFAULT_CALC_METHOD, DOMAIN
+from .timetable import CALC_METHOD_IDS, PrayerTimetable, fetch_calendar
 
 _LOGGER = logging.getLogger(__name__)
 
+# The yearly table of the current location and method is kept in .storage,
+# so restarts and daily updates don't need the network.
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.timetable"
+
 
 # Convert a list of hour/minutes of a prayer to time in format 01:07.
 # Inputs:
@@ -163,6 +170,9 @@ class IslamicPrayerDataUpdateCoordinator(DataUpdateCoordinator[dict[str, datetim
     def __init__(self, hass: HomeAssistant) -> None:
         """Initialize the Islamic Prayer client."""
         self.event_unsub: CALLBACK_TYPE | None = None
+        self.timetable: PrayerTimetable | None = None
+        self._timetable_loaded = False
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
         super().__init__(
             hass,
             _LOGGER,
@@ -174,7 +184,65 @@ class IslamicPrayerDataUpdateCoordinator(DataUpdateCoordinator[dict[str, datetim
         """Return the calculation method."""
         return self.config_entry.options.get(CONF_CALC_METHOD, DEFAULT_CALC_METHOD)
 
-    def get_new_prayer_times(self) -> dict[str, str]:
+    @property
+    def timetable_method(self) -> str:
+        """Return the standard method of the yearly table.
+
+        The Irish timetables are corrected against ISNA times, so ISNA is
+        tabled for them.
+        """
+        calc_method = self.calc_method
+        return calc_method if calc_method in CALC_METHOD_IDS else "isna"
+
+    async def _async_get_timetable(self) -> PrayerTimetable | None:
+        """Return the table for this year, location and method.
+
+        It is loaded from storage once and only fetched again when one of
+        them changed. None if it can't be fetched, then times are fetched
+        for the day as before.
+        """
+        latitude = self.hass.config.latitude
+        longitude = self.hass.config.longitude
+        method = self.timetable_method
+        year = dt_util.now().year
+
+        if not self._timetable_loaded:
+            self._timetable_loaded = True
+            try:
+                if stored := await self._store.async_load():
+                    self.timetable = PrayerTimetable.from_dict(stored)
+            except Exception as e:
+                _LOGGER.info("Ignoring the stored prayer timetable: %s", e)
+
+        if self.timetable is not None and self.timetable.matches(latitude, longitude, method, year):
+            return self.timetable
+
+        try:
+            calendar = await self.hass.async_add_executor_job(
+                fetch_calendar, latitude, longitude, method, year
+            )
+            timetable = PrayerTimetable.from_calendar(latitude, longitude, method, year, calendar)
+        except Exception as e:
+            _LOGGER.info("Failed to build the %s prayer timetable for %s: %s", method, year, e)
+            return None
+
+        _LOGGER.debug("Built the %s prayer timetable for %s", method, year)
+        self.timetable = timetable
+        await self._store.async_save(timetable.as_dict())
+        return timetable
+
+    def get_isna_base(self, timetable: PrayerTimetable | None):
+        """Return the ISNA Maghrib, Midnight and prayers of today.
+
+        Read from the yearly table if there is one, otherwise calculated.
+        """
+        if timetable is None:
+            return get_stand_sunset_midnight(self.hass.config.latitude,
+                self.hass.config.longitude, 'isna')
+        isna_prayers = timetable.times(dt_util.now().date())
+        return isna_prayers['Maghrib'], isna_prayers['Midnight'], isna_prayers
+
+    def get_new_prayer_times(self, timetable: PrayerTimetable | None = None) -> dict[str, str]:
         """Fetch prayer times for today."""
 
         calc_method = self.calc_method
@@ -184,8 +252,7 @@ class IslamicPrayerDataUpdateCoordinator(DataUpdateCoordinator[dict[str, datetim
         # https://islamireland.ie/api/timetable/ , and parse JSON
         if calc_method == 'ie-icci':
 
-            st_maghrib, midnight, isna_prayers = get_stand_sunset_midnight(self.hass.config.latitude,
-                self.hass.config.longitude, 'isna')
+            st_maghrib, midnight, isna_prayers = self.get_isna_base(timetable)
             
             current_month = datetime.today().strftime("%-m")
             current_day = datetime.today().strftime("%-d")
@@ -220,8 +287,7 @@ class IslamicPrayerDataUpdateCoordinator(DataUpdateCoordinator[dict[str, datetim
                 return isna_prayers
         # For Masjid that use WordPress Daily Prayer Time plugin
         elif calc_method == 'ie-mcnd' or calc_method == 'ie-hicc':
-            st_maghrib, midnight, isna_prayers = get_stand_sunset_midnight(self.hass.config.latitude,
-                self.hass.config.longitude, 'isna')
+            st_maghrib, midnight, isna_prayers = self.get_isna_base(timetable)
             
             url = 'https://mcnd.ie/wp-json/dpt/v1/prayertime?mcnd.ie/wp-json/dpt/v1/prayertime&filter=today'
             if calc_method == 'ie-hicc':
@@ -234,6 +300,9 @@ class IslamicPrayerDataUpdateCoordinator(DataUpdateCoordinator[dict[str, datetim
 
         # For standard calculation methods, we use fetch_prayer_times library
         # resp is Dict, sample: {'Fajr': '06:47', 'Sunrise': '08:37', 'Dhuhr': '12:22', 'Asr': '13:53', 'Sunset': '16:07', 'Maghrib': '16:07', 'Isha': '17:57', 'Imsak': '06:37', 'Midnight': '00:22'}
+        # Today is looked up in the yearly table when it could be built.
+        elif timetable is not None:
+            return timetable.times(dt_util.now().date())
         else:
             calc = PrayerTimesCalculator(
                 latitude=self.hass.config.latitude,
@@ -292,9 +361,10 @@ class IslamicPrayerDataUpdateCoordinator(DataUpdateCoordinator[dict[str, datetim
 
     async def _async_update_data(self) -> dict[str, datetime]:
         """Update sensors with new prayer times."""
+        timetable = await self._async_get_timetable()
         try:
             prayer_times = await self.hass.async_add_executor_job(
-                self.get_new_prayer_times
+                self.get_new_prayer_times, timetable
             )
         except (exceptions.InvalidResponseError, ConnError) as err:
             async_call_later(self.hass, 60, self.async_request_update)
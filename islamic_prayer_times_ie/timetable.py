@@ -0,0 +1,136 @@
+"""Yearly prayer time tables for the standard calculation methods."""
+from __future__ import annotations
+
+from array import array
+from datetime import date
+import logging
+
+import requests
+
+_LOGGER = logging.getLogger(__name__)
+
+# The whole year is fetched in one request from the same service the
+# prayer_times_calculator library asks for a single day.
+CALENDAR_URL = "https://api.aladhan.com/v1/calendar/{year}"
+CALENDAR_TIMEOUT = 30
+
+# Method ids of the service, as used by prayer_times_calculator.
+CALC_METHOD_IDS = {
+    "jafari": 0,
+    "karachi": 1,
+    "isna": 2,
+    "mwl": 3,
+    "makkah": 4,
+    "egypt": 5,
+    "tehran": 7,
+    "gulf": 8,
+    "kuwait": 9,
+    "qatar": 10,
+    "singapore": 11,
+    "france": 12,
+    "turkey": 13,
+    "russia": 14,
+}
+
+# Times kept per day, in the order they are stored.
+PRAYERS = ("Fajr", "Sunrise", "Dhuhr", "Asr", "Sunset", "Maghrib", "Isha", "Imsak", "Midnight")
+
+
+def _minutes(value: str) -> int:
+    """Return the minutes after midnight of a time like '06:47 (IST)'."""
+    hours, minutes = value.strip()[:5].split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def fetch_calendar(latitude: float, longitude: float, method: str, year: int) -> dict:
+    """Fetch the prayer times of every day of a year, keyed by month number."""
+    resp = requests.get(
+        CALENDAR_URL.format(year=year),
+        params={
+            "latitude": latitude,
+            "longitude": longitude,
+            "method": CALC_METHOD_IDS[method],
+        },
+        timeout=CALENDAR_TIMEOUT,
+    )
+    resp.raise_for_status()
+    return resp.json()["data"]
+
+
+class PrayerTimetable:
+    """Prayer times of one year at one location with one calculation method.
+
+    The times are minutes after midnight, PRAYERS per day for every day of
+    the year in a flat array, so looking up a day is an index calculation
+    and a year takes under 7 kB.
+    """
+
+    __slots__ = ("latitude", "longitude", "method", "year", "_minutes")
+
+    def __init__(
+        self, latitude: float, longitude: float, method: str, year: int, minutes: array
+    ) -> None:
+        """Initialize."""
+        self.latitude = latitude
+        self.longitude = longitude
+        self.method = method
+        self.year = year
+        self._minutes = minutes
+
+    @classmethod
+    def from_calendar(
+        cls, latitude: float, longitude: float, method: str, year: int, calendar: dict
+    ) -> PrayerTimetable:
+        """Build a table from the reply of the calendar service."""
+        days = (date(year + 1, 1, 1) - date(year, 1, 1)).days
+        minutes = array("H", bytes(2 * days * len(PRAYERS)))
+        seen = 0
+        for month_days in calendar.values():
+            for day in month_days:
+                day_month_year = day["date"]["gregorian"]["date"]
+                day_of_month, month, _ = (int(part) for part in day_month_year.split("-"))
+                start = (date(year, month, day_of_month).timetuple().tm_yday - 1) * len(PRAYERS)
+                for index, prayer in enumerate(PRAYERS):
+                    minutes[start + index] = _minutes(day["timings"][prayer])
+                seen += 1
+        if seen != days:
+            raise ValueError(f"Calendar for {year} has {seen} days instead of {days}")
+        return cls(latitude, longitude, method, year, minutes)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> PrayerTimetable:
+        """Build a table from the output of as_dict()."""
+        return cls(
+            data["latitude"],
+            data["longitude"],
+            data["method"],
+            data["year"],
+            array("H", data["minutes"]),
+        )
+
+    def as_dict(self) -> dict:
+        """Return the table as a JSON serializable dict."""
+        return {
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "method": self.method,
+            "year": self.year,
+            "minutes": self._minutes.tolist(),
+        }
+
+    def matches(self, latitude: float, longitude: float, method: str, year: int) -> bool:
+        """Return True if the table holds the times asked for."""
+        return (self.latitude, self.longitude, self.method, self.year) == (
+            latitude,
+            longitude,
+            method,
+            year,
+        )
+
+    def times(self, day: date) -> dict[str, str]:
+        """Return the times of a day like PrayerTimesCalculator.fetch_prayer_times()."""
+        start = (day.timetuple().tm_yday - 1) * len(PRAYERS)
+        return {
+            prayer: f"{minutes // 60:02d}:{minutes % 60:02d}"
+            for prayer, minutes in zip(PRAYERS, self._minutes[start : start + len(PRAYERS)])
+        }